@@ -35,6 +35,7 @@ class SetTrack(BaseModel):
     notes: str | None = Field(default=None, description="DJ notes for this transition")
 
     model_config = {
+        "extra": "forbid",
         "json_schema_extra": {
             "examples": [
                 {
@@ -46,7 +47,7 @@ class SetTrack(BaseModel):
                     "notes": "Start with intro, build slowly",
                 }
             ]
-        }
+        },
     }
 
 
@@ -96,8 +97,10 @@ class Set(BaseModel):
     @classmethod
     def validate_energy_curve(cls, v: list[int]) -> list[int]:
         """Validate energy curve values are between 1-10."""
-        for energy in v:
-            if not 1 <= energy <= 10:
+        if v:
+            low, high = min(v), max(v)
+            if low < 1 or high > 10:
+                energy = low if low < 1 else high
                 msg = f"Energy curve values must be between 1-10, got {energy}"
                 raise ValueError(msg)
         return v
@@ -159,16 +162,18 @@ class Set(BaseModel):
         Returns:
             The removed SetTrack or None if not found.
         """
-        for i, track in enumerate(self.tracks):
-            if track.position == position:
-                removed = self.tracks.pop(i)
-                # Reorder remaining tracks
-                for j, t in enumerate(self.tracks):
-                    # Create new SetTrack with updated position
-                    self.tracks[j] = t.model_copy(update={"position": j + 1})
-                self.updated_at = datetime.now()
-                return removed
-        return None
+        # Positions are sequential from 1 (see validate_track_positions),
+        # so the list index is position - 1.
+        if not 1 <= position <= len(self.tracks):
+            return None
+
+        removed = self.tracks.pop(position - 1)
+        # Renumber only the tracks that shifted down
+        for j in range(position - 1, len(self.tracks)):
+            # Create new SetTrack with updated position
+            self.tracks[j] = self.tracks[j].model_copy(update={"position": j + 1})
+        self.updated_at = datetime.now()
+        return removed
 
     def reorder_track(self, from_position: int, to_position: int) -> bool:
         """Move a track from one position to another.
@@ -188,22 +193,12 @@ class Set(BaseModel):
         if not 1 <= to_position <= len(self.tracks):
             return False
 
-        # Find and remove the track
-        track_to_move = None
-        for i, track in enumerate(self.tracks):
-            if track.position == from_position:
-                track_to_move = self.tracks.pop(i)
-                break
-
-        if track_to_move is None:
-            return False
-
-        # Insert at new position (convert to 0-indexed)
-        self.tracks.insert(to_position - 1, track_to_move)
+        # Move the track (positions map directly to 0-indexed list slots)
+        self.tracks.insert(to_position - 1, self.tracks.pop(from_position - 1))
 
-        # Reorder all positions
-        for i, track in enumerate(self.tracks):
-            self.tracks[i] = track.model_copy(update={"position": i + 1})
+        # Renumber only the span between the two positions
+        for i in range(min(from_position, to_position) - 1, max(from_position, to_position)):
+            self.tracks[i] = self.tracks[i].model_copy(update={"position": i + 1})
 
         self.updated_at = datetime.now()
         return True
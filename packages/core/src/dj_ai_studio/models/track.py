@@ -133,6 +133,7 @@ class Track(BaseModel):
         return v
 
     model_config = {
+        "extra": "forbid",
         "json_schema_extra": {
             "examples": [
                 {
@@ -151,5 +152,5 @@ class Track(BaseModel):
                     "source_id": "0VjIjW4GlUZAMYd2vXMi3b",
                 }
             ]
-        }
+        },
     }
@@ -12,8 +12,11 @@ from dj_ai_studio.yandex.api import (
 )
 from dj_ai_studio.yandex.client import YandexClient, YandexClientConfig
 from dj_ai_studio.yandex.converter import (
+    CAMELOT_TO_KEY,
+    KEY_TO_CAMELOT,
     camelot_to_key,
     key_to_camelot,
+    keys_to_camelot,
     yandex_track_to_track,
 )
 from dj_ai_studio.yandex.mime_utils import MimeType, guess_mime_type
@@ -35,7 +38,10 @@ __all__ = [
     # Converter
     "yandex_track_to_track",
     "key_to_camelot",
+    "keys_to_camelot",
     "camelot_to_key",
+    "KEY_TO_CAMELOT",
+    "CAMELOT_TO_KEY",
     # Utils
     "MimeType",
     "guess_mime_type",
@@ -3,15 +3,24 @@
 import base64
 import hashlib
 import hmac
+import json
 import random
+import sys
 import time
 from dataclasses import dataclass
 from enum import Enum, auto
-from typing import cast
 
+import requests
 from Crypto.Cipher import AES
 from strenum import StrEnum
 from yandex_music import Client, Track
+from yandex_music.exceptions import (
+    BadRequestError,
+    NetworkError,
+    NotFoundError,
+    TimedOutError,
+    UnauthorizedError,
+)
 from yandex_music.utils.sign_request import DEFAULT_SIGN_KEY
 
 
@@ -39,14 +48,18 @@ class FileFormat:
     codec: Codec
 
 
+# Keys are interned so lookups with interned codec names hit the identity fast path
 FILE_FORMAT_MAPPING: dict[str, FileFormat] = {
-    "flac": FileFormat(Container.FLAC, Codec.FLAC),
-    "flac-mp4": FileFormat(Container.MP4, Codec.FLAC),
-    "mp3": FileFormat(Container.MP3, Codec.MP3),
-    "aac": FileFormat(Container.MP4, Codec.AAC),
-    "he-aac": FileFormat(Container.MP4, Codec.AAC),
-    "aac-mp4": FileFormat(Container.MP4, Codec.AAC),
-    "he-aac-mp4": FileFormat(Container.MP4, Codec.AAC),
+    sys.intern(codec): file_format
+    for codec, file_format in {
+        "flac": FileFormat(Container.FLAC, Codec.FLAC),
+        "flac-mp4": FileFormat(Container.MP4, Codec.FLAC),
+        "mp3": FileFormat(Container.MP3, Codec.MP3),
+        "aac": FileFormat(Container.MP4, Codec.AAC),
+        "he-aac": FileFormat(Container.MP4, Codec.AAC),
+        "aac-mp4": FileFormat(Container.MP4, Codec.AAC),
+        "he-aac-mp4": FileFormat(Container.MP4, Codec.AAC),
+    }.items()
 }
 
 
@@ -99,11 +112,16 @@ def get_download_info(track: Track, quality: ApiTrackQuality) -> CustomDownloadI
     sign = base64.b64encode(hmac_sign.digest()).decode()[:-1]
     params["sign"] = sign
 
-    resp = client.request.get("https://api.music.yandex.net/get-file-info", params=params)
-    resp = cast(dict, resp)
-    e = resp["download_info"]
+    # Fetch the raw body and decode only the fields we need, skipping the
+    # library's per-key camelCase normalization and Response object build.
+    raw = client.request.retrieve(
+        "https://api.music.yandex.net/get-file-info",
+        params=params,
+        headers=client.request.headers,
+    )
+    e = _parse_download_info(raw)
 
-    raw_codec = e["codec"]
+    raw_codec = sys.intern(e["codec"])
     file_format = FILE_FORMAT_MAPPING.get(raw_codec)
     if file_format is None:
         raise ValueError(f"Unknown codec: {raw_codec}")
@@ -117,22 +135,73 @@ def get_download_info(track: Track, quality: ApiTrackQuality) -> CustomDownloadI
     )
 
 
-def download_track_data(client: Client, download_info: CustomDownloadInfo) -> bytes:
+def _parse_download_info(raw: bytes) -> dict:
+    """Extract the ``downloadInfo`` object from a raw get-file-info response."""
+    data = json.loads(raw)
+    result = data.get("result") or data
+    info = result.get("downloadInfo") or result.get("download_info")
+    if info is None:
+        raise ValueError("Missing download info in get-file-info response")
+    return info
+
+
+def download_track_data(
+    client: Client,
+    download_info: CustomDownloadInfo,
+    session: requests.Session | None = None,
+    timeout: float | None = None,
+) -> bytes:
     """Download track data from Yandex Music.
 
     Args:
         client: Initialized Yandex Music client
         download_info: Download information with URLs and key
+        session: Optional pooled HTTP session to reuse connections across downloads
+        timeout: Request timeout in seconds when downloading through ``session``
 
     Returns:
         Raw audio data (decrypted if needed)
     """
-    data = client.request.retrieve(random.choice(download_info.urls))
+    urls = download_info.urls
+    url = urls[0] if len(urls) == 1 else random.choice(urls)
+    if session is None:
+        data = client.request.retrieve(url)
+    else:
+        data = _retrieve(session, url, timeout)
     if decryption_key := download_info.decryption_key:
         data = decrypt_data(data, decryption_key)
     return data
 
 
+def _retrieve(session: requests.Session, url: str, timeout: float | None) -> bytes:
+    """Fetch raw bytes over a pooled session, raising yandex-music errors.
+
+    Status codes map to the same exceptions as ``client.request.retrieve``.
+    ``UnauthorizedError`` is not a ``NetworkError``, so an expired signed link
+    (401/403) fails immediately instead of going through the retry backoff.
+    """
+    try:
+        resp = session.get(url, timeout=timeout)
+    except requests.Timeout as e:
+        raise TimedOutError from e
+    except requests.RequestException as e:
+        raise NetworkError(e) from e
+
+    status = resp.status_code
+    if status in (401, 403):
+        raise UnauthorizedError(f"{status} {resp.reason}")
+    if status == 400:
+        raise BadRequestError(f"{status} {resp.reason}")
+    if status == 404:
+        raise NotFoundError(f"{status} {resp.reason}")
+
+    try:
+        resp.raise_for_status()
+    except requests.HTTPError as e:
+        raise NetworkError(e) from e
+    return resp.content
+
+
 def decrypt_data(data: bytes, key: str) -> bytes:
     """Decrypt AES-CTR encrypted track data.
 
@@ -1,10 +1,13 @@
 """Async wrapper for Yandex Music client."""
 
 import asyncio
+import random
 import time
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
+import requests
+from requests.adapters import HTTPAdapter
 from yandex_music import Client, Playlist, Track
 from yandex_music.exceptions import NetworkError
 
@@ -18,6 +21,22 @@ from dj_ai_studio.yandex.api import (
 if TYPE_CHECKING:
     from collections.abc import AsyncGenerator
 
+MAX_RETRY_DELAY = 60.0  # Upper bound for a single backoff sleep, in seconds
+TRACKS_BATCH_SIZE = 100  # Track IDs per client.tracks() request
+
+
+def _retry_after(error: NetworkError) -> float | None:
+    """Extract a Retry-After delay from an HTTP 429 response behind ``error``."""
+    cause = error.__cause__
+    if not isinstance(cause, requests.HTTPError) or cause.response is None:
+        return None
+    if cause.response.status_code != 429:
+        return None
+    try:
+        return float(cause.response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
+
 
 @dataclass
 class YandexClientConfig:
@@ -27,6 +46,8 @@ class YandexClientConfig:
     timeout: int = 20
     max_retries: int = 3
     retry_delay: int = 5
+    pool_size: int = 16
+    max_concurrent_requests: int = 8
 
 
 class YandexClient:
@@ -44,13 +65,17 @@ class YandexClient:
         """
         self.config = config
         self._client: Client | None = None
+        self._session: requests.Session | None = None
 
     def _init_sync_client(self) -> Client:
         """Initialize the synchronous client with retry logic."""
         client = Client(self.config.token)
         client.request.set_timeout(self.config.timeout)
+        client.request._request_wrapper = self._with_retries(client.request._request_wrapper)
+        return client.init()
 
-        original_wrapper = client.request._request_wrapper
+    def _with_retries(self, func: Any) -> Any:
+        """Wrap a blocking network call with the configured retry policy."""
         max_retries = self.config.max_retries
         retry_delay = self.config.retry_delay
 
@@ -58,16 +83,32 @@ class YandexClient:
             tries = 0
             while True:
                 try:
-                    return original_wrapper(*args, **kwargs)
+                    return func(*args, **kwargs)
                 except NetworkError as error:
                     if max_retries == 0 or tries < max_retries:
+                        delay = _retry_after(error)
+                        if delay is None:
+                            # Exponential backoff with jitter
+                            delay = retry_delay * 2 ** min(tries, 10) + random.random() * 0.5
                         tries += 1
-                        time.sleep(retry_delay)
+                        time.sleep(min(MAX_RETRY_DELAY, delay))
                         continue
                     raise error
 
-        client.request._request_wrapper = retry_wrapper
-        return client.init()
+        return retry_wrapper
+
+    def _get_session(self) -> requests.Session:
+        """Get or create the pooled keep-alive session used for media downloads."""
+        if self._session is None:
+            pool_size = self.config.pool_size
+            adapter = HTTPAdapter(
+                pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True
+            )
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.headers["Connection"] = "keep-alive"
+            self._session = session
+        return self._session
 
     async def _get_client(self) -> Client:
         """Get or create the sync client in thread pool."""
@@ -98,7 +139,22 @@ class YandexClient:
             List of Track objects
         """
         client = await self._get_client()
-        return await asyncio.to_thread(client.tracks, track_ids)
+        if len(track_ids) <= TRACKS_BATCH_SIZE:
+            return await asyncio.to_thread(client.tracks, track_ids)
+
+        semaphore = asyncio.Semaphore(self.config.max_concurrent_requests)
+
+        async def fetch(batch_ids: list[str | int]) -> list[Track]:
+            async with semaphore:
+                return await asyncio.to_thread(client.tracks, batch_ids)
+
+        batches = await asyncio.gather(
+            *(
+                fetch(track_ids[i : i + TRACKS_BATCH_SIZE])
+                for i in range(0, len(track_ids), TRACKS_BATCH_SIZE)
+            )
+        )
+        return [track for batch in batches for track in batch]
 
     async def get_playlist(self, user_id: str, playlist_id: str | int) -> Playlist | None:
         """Get a playlist by user and playlist ID.
@@ -188,7 +244,13 @@ class YandexClient:
         """
         client = await self._get_client()
         download_info = await self.get_download_info(track, quality)
-        return await asyncio.to_thread(download_track_data, client, download_info)
+        return await asyncio.to_thread(
+            self._with_retries(download_track_data),
+            client,
+            download_info,
+            self._get_session(),
+            self.config.timeout,
+        )
 
     async def download_cover(
         self,
@@ -235,3 +297,6 @@ class YandexClient:
     async def close(self) -> None:
         """Close the client connection."""
         self._client = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
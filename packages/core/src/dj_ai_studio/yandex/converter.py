@@ -1,5 +1,6 @@
 """Convert Yandex Music objects to DJ AI Studio models."""
 
+from collections.abc import Iterable
 from datetime import datetime
 from typing import TYPE_CHECKING
 
@@ -15,6 +16,17 @@ DEFAULT_KEY = "C"  # Placeholder key (C major)
 DEFAULT_CAMELOT = "8B"  # Camelot for C major
 DEFAULT_ENERGY = 5  # Middle energy level
 
+# Formatted "{size}x{size}" cover tokens, keyed by cover size
+_COVER_SIZE_FMT_CACHE: dict[int, str] = {}
+
+
+def _cover_size_fmt(cover_size: int) -> str:
+    """Get the cached "{size}x{size}" token for a cover size."""
+    fmt = _COVER_SIZE_FMT_CACHE.get(cover_size)
+    if fmt is None:
+        fmt = _COVER_SIZE_FMT_CACHE[cover_size] = f"{cover_size}x{cover_size}"
+    return fmt
+
 
 def yandex_track_to_track(
     yandex_track: "YandexTrack",
@@ -24,6 +36,7 @@ def yandex_track_to_track(
     camelot: str | None = None,
     energy: int | None = None,
     cover_size: int = 400,
+    now: datetime | None = None,
 ) -> Track:
     """Convert Yandex Music track to DJ AI Studio Track.
 
@@ -38,6 +51,7 @@ def yandex_track_to_track(
         camelot: Analyzed Camelot notation or None for placeholder
         energy: Analyzed energy level or None for placeholder
         cover_size: Cover image size for URL generation
+        now: Timestamp to use as ``created_at``, defaults to the current time
 
     Returns:
         Track model instance
@@ -61,15 +75,38 @@ def yandex_track_to_track(
     # Build cover URL
     cover_url: str | None = None
     if yandex_track.cover_uri:
-        cover_url = f"https://{yandex_track.cover_uri.replace('%%', f'{cover_size}x{cover_size}')}"
+        cover_url = "https://" + yandex_track.cover_uri.replace("%%", _cover_size_fmt(cover_size))
 
     # Track duration in milliseconds
-    duration_ms = (yandex_track.duration_ms or 0) if hasattr(yandex_track, "duration_ms") else 0
-    if duration_ms == 0 and yandex_track.duration_ms:
-        duration_ms = yandex_track.duration_ms
+    duration_ms = getattr(yandex_track, "duration_ms", 0) or 0
+
+    title = _full_title(yandex_track)
+    source_id = str(yandex_track.id)
+    created_at = now if now is not None else datetime.now()
+
+    # Fast path: placeholder DJ attributes are known-valid, so when the
+    # Yandex-provided fields satisfy the model constraints we can skip
+    # Pydantic validation entirely.
+    if bpm is None and key is None and camelot is None and energy is None:
+        if title and duration_ms > 0:
+            return Track.model_construct(
+                title=title,
+                artists=artists,
+                album=album_title,
+                duration_ms=duration_ms,
+                bpm=DEFAULT_BPM,
+                key=DEFAULT_KEY,
+                camelot=DEFAULT_CAMELOT,
+                energy=DEFAULT_ENERGY,
+                genre=album_genre,
+                source="yandex",
+                source_id=source_id,
+                cover_url=cover_url,
+                created_at=created_at,
+            )
 
     return Track(
-        title=_full_title(yandex_track),
+        title=title,
         artists=artists,
         album=album_title,
         duration_ms=duration_ms,
@@ -79,9 +116,9 @@ def yandex_track_to_track(
         energy=energy if energy is not None else DEFAULT_ENERGY,
         genre=album_genre,
         source="yandex",
-        source_id=str(yandex_track.id),
+        source_id=source_id,
         cover_url=cover_url,
-        created_at=datetime.now(),
+        created_at=created_at,
     )
 
 
@@ -95,9 +132,81 @@ def _full_title(obj) -> str:
         Full title string
     """
     title = obj.title or ""
-    if hasattr(obj, "version") and obj.version:
-        title = f"{title} ({obj.version})"
-    return title
+    version = getattr(obj, "version", None)
+    return f"{title} ({version})" if version else title
+
+
+# Camelot wheel lookup tables, built once at import time
+# Major keys (B suffix)
+_MAJOR: dict[str, str] = {
+    "C": "8B",
+    "G": "9B",
+    "D": "10B",
+    "A": "11B",
+    "E": "12B",
+    "B": "1B",
+    "F#": "2B",
+    "Gb": "2B",
+    "Db": "3B",
+    "C#": "3B",
+    "Ab": "4B",
+    "G#": "4B",
+    "Eb": "5B",
+    "D#": "5B",
+    "Bb": "6B",
+    "A#": "6B",
+    "F": "7B",
+}
+
+# Minor keys (A suffix)
+_MINOR: dict[str, str] = {
+    "Am": "8A",
+    "Em": "9A",
+    "Bm": "10A",
+    "F#m": "11A",
+    "Gbm": "11A",
+    "C#m": "12A",
+    "Dbm": "12A",
+    "G#m": "1A",
+    "Abm": "1A",
+    "D#m": "2A",
+    "Ebm": "2A",
+    "A#m": "3A",
+    "Bbm": "3A",
+    "Fm": "4A",
+    "Cm": "5A",
+    "Gm": "6A",
+    "Dm": "7A",
+}
+
+KEY_TO_CAMELOT: dict[str, str] = {**_MAJOR, **_MINOR}
+
+CAMELOT_TO_KEY: dict[str, str] = {
+    "1A": "G#m",
+    "2A": "D#m",
+    "3A": "A#m",
+    "4A": "Fm",
+    "5A": "Cm",
+    "6A": "Gm",
+    "7A": "Dm",
+    "8A": "Am",
+    "9A": "Em",
+    "10A": "Bm",
+    "11A": "F#m",
+    "12A": "C#m",
+    "1B": "B",
+    "2B": "F#",
+    "3B": "Db",
+    "4B": "Ab",
+    "5B": "Eb",
+    "6B": "Bb",
+    "7B": "F",
+    "8B": "C",
+    "9B": "G",
+    "10B": "D",
+    "11B": "A",
+    "12B": "E",
+}
 
 
 def key_to_camelot(key: str) -> str:
@@ -107,58 +216,22 @@ def key_to_camelot(key: str) -> str:
         key: Musical key (e.g., "Am", "C", "F#m")
 
     Returns:
-        Camelot notation (e.g., "8A", "8B", "2A")
+        Camelot notation (e.g., "8A", "8B", "2A"), "8B" for unknown keys
+    """
+    return KEY_TO_CAMELOT.get(key, "8B")
+
+
+def keys_to_camelot(keys: Iterable[str]) -> list[str]:
+    """Convert a batch of musical keys to Camelot wheel notation.
+
+    Args:
+        keys: Musical keys (e.g., ["Am", "C", "F#m"])
+
+    Returns:
+        Camelot notations in input order, "8B" for unknown keys
     """
-    # Camelot wheel mapping
-    # Major keys (B suffix)
-    major_map = {
-        "C": "8B",
-        "G": "9B",
-        "D": "10B",
-        "A": "11B",
-        "E": "12B",
-        "B": "1B",
-        "F#": "2B",
-        "Gb": "2B",
-        "Db": "3B",
-        "C#": "3B",
-        "Ab": "4B",
-        "G#": "4B",
-        "Eb": "5B",
-        "D#": "5B",
-        "Bb": "6B",
-        "A#": "6B",
-        "F": "7B",
-    }
-
-    # Minor keys (A suffix)
-    minor_map = {
-        "Am": "8A",
-        "Em": "9A",
-        "Bm": "10A",
-        "F#m": "11A",
-        "Gbm": "11A",
-        "C#m": "12A",
-        "Dbm": "12A",
-        "G#m": "1A",
-        "Abm": "1A",
-        "D#m": "2A",
-        "Ebm": "2A",
-        "A#m": "3A",
-        "Bbm": "3A",
-        "Fm": "4A",
-        "Cm": "5A",
-        "Gm": "6A",
-        "Dm": "7A",
-    }
-
-    if key in minor_map:
-        return minor_map[key]
-    if key in major_map:
-        return major_map[key]
-
-    # Fallback
-    return "8B"
+    get = KEY_TO_CAMELOT.get
+    return [get(key, "8B") for key in keys]
 
 
 def camelot_to_key(camelot: str) -> str:
@@ -168,32 +241,6 @@ def camelot_to_key(camelot: str) -> str:
         camelot: Camelot notation (e.g., "8A", "8B")
 
     Returns:
-        Musical key (e.g., "Am", "C")
+        Musical key (e.g., "Am", "C"), "C" for unknown notation
     """
-    camelot_map = {
-        "1A": "G#m",
-        "2A": "D#m",
-        "3A": "A#m",
-        "4A": "Fm",
-        "5A": "Cm",
-        "6A": "Gm",
-        "7A": "Dm",
-        "8A": "Am",
-        "9A": "Em",
-        "10A": "Bm",
-        "11A": "F#m",
-        "12A": "C#m",
-        "1B": "B",
-        "2B": "F#",
-        "3B": "Db",
-        "4B": "Ab",
-        "5B": "Eb",
-        "6B": "Bb",
-        "7B": "F",
-        "8B": "C",
-        "9B": "G",
-        "10B": "D",
-        "11B": "A",
-        "12B": "E",
-    }
-    return camelot_map.get(camelot, "C")
+    return CAMELOT_TO_KEY.get(camelot, "C")
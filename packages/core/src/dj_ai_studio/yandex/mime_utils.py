@@ -10,11 +10,21 @@ class MimeType(Enum):
     PNG = "image/png"
 
 
+# Ordered by how often each type is seen (JPEG is typical for cover art);
+# keep new types in frequency order.
 MAGIC_BYTES: tuple[tuple[MimeType, bytes], ...] = (
     (MimeType.JPEG, bytes((0xFF, 0xD8, 0xFF))),
     (MimeType.PNG, bytes((0x89, 0x50, 0x4E, 0x47, 0x0D, 0x0A, 0x1A, 0x0A))),
 )
 
+# Shortest signature; smaller buffers cannot match anything
+_MIN_MAGIC_LENGTH = min(len(magic_bytes) for _, magic_bytes in MAGIC_BYTES)
+
+# Dispatch on the first byte: each supported format has a unique leading byte
+_FIRST_BYTE_TABLE: dict[int, tuple[bytes, MimeType]] = {
+    magic_bytes[0]: (magic_bytes, mime_type) for mime_type, magic_bytes in MAGIC_BYTES
+}
+
 
 def guess_mime_type(data: bytes) -> MimeType | None:
     """Guess MIME type from image data magic bytes.
@@ -25,7 +35,9 @@ def guess_mime_type(data: bytes) -> MimeType | None:
     Returns:
         MimeType if recognized, None otherwise
     """
-    for mime_type, magic_bytes in MAGIC_BYTES:
-        if data.startswith(magic_bytes):
-            return mime_type
+    if len(data) < _MIN_MAGIC_LENGTH:
+        return None
+    entry = _FIRST_BYTE_TABLE.get(data[0])
+    if entry is not None and data.startswith(entry[0]):
+        return entry[1]
     return None
@@ -1,19 +1,34 @@
 """Playlist synchronization service for Yandex Music."""
 
+import asyncio
+from collections.abc import Awaitable
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import select
+from sqlalchemy import bindparam, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from dj_ai_studio.db import PlaylistORM, TrackORM
-from dj_ai_studio.models import Track
+from dj_ai_studio.models import Track, TrackStructure
 from dj_ai_studio.yandex.client import YandexClient
 from dj_ai_studio.yandex.converter import yandex_track_to_track
 
 if TYPE_CHECKING:
     from yandex_music import Playlist as YandexPlaylist
+    from yandex_music import Track as YandexTrack
+
+SYNC_BATCH_SIZE = 500  # Tracks per existence-check query
+SYNC_CONCURRENCY = 4  # Playlists fetched from Yandex concurrently
+
+# Existence lookup built once; the IN list is bound per execution
+_TRACK_LOOKUP_STMT = select(TrackORM.source_id, TrackORM.id, TrackORM.analyzed_at).where(
+    TrackORM.source == "yandex",
+    TrackORM.source_id.in_(bindparam("source_ids", expanding=True)),
+)
+
+# Serialized structure of a track with no markers (every newly synced track)
+_EMPTY_STRUCTURE: dict = TrackStructure().model_dump()
 
 
 @dataclass
@@ -27,6 +42,14 @@ class SyncResult:
     errors: list[str] = field(default_factory=list)
 
 
+@dataclass(slots=True)
+class _SyncedTrack:
+    """Database identity and analysis state of a synced track."""
+
+    id: str
+    analyzed_at: datetime | None
+
+
 @dataclass
 class SyncStats:
     """Statistics for a full sync operation."""
@@ -50,6 +73,10 @@ class YandexSyncService:
         """
         self.client = client
         self.session = session
+        # Tracks already synced by this service, keyed by Yandex track ID
+        self._track_cache: dict[str, _SyncedTrack] = {}
+        # Timestamp shared by every row written during the current sync run
+        self._sync_now = datetime.now()
 
     async def sync_playlist(
         self,
@@ -65,43 +92,7 @@ class YandexSyncService:
         Returns:
             SyncResult with statistics
         """
-        result = SyncResult(playlist_id=str(playlist_id))
-
-        try:
-            # Get playlist info
-            playlist = await self.client.get_playlist(user_id, playlist_id)
-            if playlist is None:
-                result.errors.append(f"Playlist {playlist_id} not found")
-                return result
-
-            # Get or create playlist in DB
-            db_playlist = await self._get_or_create_playlist(playlist)
-
-            # Sync tracks
-            track_ids: list[str] = []
-            async for yandex_track in self.client.get_playlist_tracks(user_id, playlist_id):
-                try:
-                    track = await self._sync_track(yandex_track)
-                    track_ids.append(str(track.id))
-
-                    if track.analyzed_at is None:
-                        result.tracks_added += 1
-                    else:
-                        result.tracks_skipped += 1
-
-                except Exception as e:
-                    result.errors.append(f"Track {yandex_track.id}: {e}")
-
-            # Update playlist track IDs
-            db_playlist.track_ids = track_ids
-            db_playlist.synced_at = datetime.now()
-            await self.session.commit()
-
-        except Exception as e:
-            result.errors.append(str(e))
-            await self.session.rollback()
-
-        return result
+        return await self._store_playlist(playlist_id, self._fetch_playlist(user_id, playlist_id))
 
     async def sync_liked_tracks(self) -> SyncResult:
         """Sync user's liked tracks from Yandex Music.
@@ -110,25 +101,24 @@ class YandexSyncService:
             SyncResult with statistics
         """
         result = SyncResult(playlist_id="liked")
+        self._sync_now = datetime.now()
 
         try:
+            batch: list[YandexTrack] = []
             async for yandex_track in self.client.get_liked_tracks():
-                try:
-                    track = await self._sync_track(yandex_track)
-
-                    if track.analyzed_at is None:
-                        result.tracks_added += 1
-                    else:
-                        result.tracks_skipped += 1
-
-                except Exception as e:
-                    result.errors.append(f"Track {yandex_track.id}: {e}")
+                batch.append(yandex_track)
+                if len(batch) >= SYNC_BATCH_SIZE:
+                    await self._sync_batch(batch, result)
+                    batch = []
+            if batch:
+                await self._sync_batch(batch, result)
 
             await self.session.commit()
 
         except Exception as e:
             result.errors.append(str(e))
             await self.session.rollback()
+            self._track_cache.clear()
 
         return result
 
@@ -146,118 +136,258 @@ class YandexSyncService:
         try:
             playlists = await self.client.get_user_playlists(user_id)
 
+            targets: list[tuple[str, int]] = []
             for playlist in playlists:
                 if playlist.kind is None or playlist.owner is None:
                     continue
 
-                owner_id = (
-                    playlist.owner.login
-                    if hasattr(playlist.owner, "login")
-                    else str(playlist.owner.uid)
-                )
-                result = await self.sync_playlist(owner_id, playlist.kind)
-
-                stats.playlists_synced += 1
-                stats.total_tracks_added += result.tracks_added
-                stats.total_tracks_updated += result.tracks_updated
-                stats.total_tracks_skipped += result.tracks_skipped
-                stats.errors.extend(result.errors)
+                owner_id = getattr(playlist.owner, "login", None) or str(playlist.owner.uid)
+                targets.append((owner_id, playlist.kind))
+
+            # Fetch playlists from Yandex concurrently; database writes stay
+            # sequential because the session is not safe for concurrent use.
+            semaphore = asyncio.Semaphore(SYNC_CONCURRENCY)
+
+            async def fetch(
+                owner_id: str, kind: int
+            ) -> "tuple[YandexPlaylist | None, list[YandexTrack]]":
+                async with semaphore:
+                    return await self._fetch_playlist(owner_id, kind)
+
+            fetches = [asyncio.create_task(fetch(*target)) for target in targets]
+            try:
+                for (_, kind), fetched in zip(targets, fetches, strict=True):
+                    result = await self._store_playlist(kind, fetched)
+
+                    stats.playlists_synced += 1
+                    stats.total_tracks_added += result.tracks_added
+                    stats.total_tracks_updated += result.tracks_updated
+                    stats.total_tracks_skipped += result.tracks_skipped
+                    stats.errors.extend(result.errors)
+            finally:
+                # Don't leave fetches running if storing fails or the sync is cancelled
+                for task in fetches:
+                    task.cancel()
+                await asyncio.gather(*fetches, return_exceptions=True)
 
         except Exception as e:
             stats.errors.append(str(e))
 
         return stats
 
-    async def _sync_track(self, yandex_track) -> Track:
-        """Sync a single track to database.
+    async def _fetch_playlist(
+        self,
+        user_id: str,
+        playlist_id: str | int,
+    ) -> "tuple[YandexPlaylist | None, list[YandexTrack]]":
+        """Fetch a playlist and all of its tracks from Yandex Music.
 
         Args:
-            yandex_track: Yandex Music track object
+            user_id: Playlist owner's user ID
+            playlist_id: Playlist ID (kind)
 
         Returns:
-            Track model (existing or newly created)
+            Playlist object (or None if not found) and its tracks
         """
-        # Check if track already exists
-        result = await self.session.execute(
-            select(TrackORM).where(
-                TrackORM.source == "yandex",
-                TrackORM.source_id == str(yandex_track.id),
-            )
-        )
-        db_track = result.scalar_one_or_none()
-
-        if db_track is not None:
-            # Return existing track
-            return Track.model_validate(db_track, from_attributes=True)
-
-        # Create new track
-        track = yandex_track_to_track(yandex_track)
-
-        db_track = TrackORM(
-            id=str(track.id),
-            title=track.title,
-            artists=track.artists,
-            album=track.album,
-            duration_ms=track.duration_ms,
-            bpm=track.bpm,
-            key=track.key,
-            camelot=track.camelot,
-            energy=track.energy,
-            mood=track.mood,
-            genre=track.genre,
-            vocals=track.vocals,
-            structure=track.structure.model_dump() if track.structure else None,
-            rating=track.rating,
-            tags=track.tags,
-            notes=track.notes,
-            source=track.source,
-            source_id=track.source_id,
-            cover_url=track.cover_url,
-            created_at=track.created_at,
-            analyzed_at=None,  # Not analyzed yet
-        )
+        playlist = await self.client.get_playlist(user_id, playlist_id)
+        if playlist is None:
+            return None, []
+        tracks = [track async for track in self.client.get_playlist_tracks(user_id, playlist_id)]
+        return playlist, tracks
 
-        self.session.add(db_track)
-        await self.session.flush()
+    async def _store_playlist(
+        self,
+        playlist_id: str | int,
+        fetched: "Awaitable[tuple[YandexPlaylist | None, list[YandexTrack]]]",
+    ) -> SyncResult:
+        """Write a fetched playlist and its tracks to the database.
 
-        return track
+        Args:
+            playlist_id: Playlist ID (kind)
+            fetched: Pending result of ``_fetch_playlist``
 
-    async def _get_or_create_playlist(
+        Returns:
+            SyncResult with statistics
+        """
+        result = SyncResult(playlist_id=str(playlist_id))
+        self._sync_now = datetime.now()
+
+        try:
+            # Get playlist info
+            playlist, yandex_tracks = await fetched
+            if playlist is None:
+                result.errors.append(f"Playlist {playlist_id} not found")
+                return result
+
+            # Sync tracks in batches
+            track_ids: list[str] = []
+            for i in range(0, len(yandex_tracks), SYNC_BATCH_SIZE):
+                batch = yandex_tracks[i : i + SYNC_BATCH_SIZE]
+                track_ids.extend(await self._sync_batch(batch, result))
+
+            # Create or update playlist in DB
+            await self._save_playlist(playlist, track_ids)
+            await self.session.commit()
+
+        except Exception as e:
+            result.errors.append(str(e))
+            await self.session.rollback()
+            self._track_cache.clear()
+
+        return result
+
+    async def _sync_batch(
         self,
-        yandex_playlist: "YandexPlaylist",
-    ) -> PlaylistORM:
-        """Get or create playlist in database.
+        yandex_tracks: "list[YandexTrack]",
+        result: SyncResult,
+    ) -> list[str]:
+        """Sync a batch of tracks and update result counters.
 
         Args:
-            yandex_playlist: Yandex Music playlist object
+            yandex_tracks: Yandex Music track objects
+            result: SyncResult to update with counts and errors
 
         Returns:
-            PlaylistORM instance
+            IDs of the synced tracks, in input order
+        """
+        tracks = await self._sync_tracks(yandex_tracks, result.errors)
+        for track in tracks:
+            if track.analyzed_at is None:
+                result.tracks_added += 1
+            else:
+                result.tracks_skipped += 1
+        return [track.id for track in tracks]
+
+    async def _sync_tracks(
+        self,
+        yandex_tracks: "list[YandexTrack]",
+        errors: list[str],
+    ) -> list[_SyncedTrack]:
+        """Sync a batch of tracks to database.
+
+        Looks up all existing tracks with a single ``IN`` query and
+        inserts the missing ones with one bulk ``INSERT``.
+
+        Args:
+            yandex_tracks: Yandex Music track objects
+            errors: List to append per-track error messages to
+
+        Returns:
+            Synced track records (existing or newly created), in input order
+        """
+        cache = self._track_cache
+        source_ids = [str(t.id) for t in yandex_tracks]
+
+        # Check which uncached tracks already exist
+        existing: dict[str, _SyncedTrack] = {}
+        lookup_ids = {source_id for source_id in source_ids if source_id not in cache}
+        if lookup_ids:
+            # Only the identity and analysis state are needed, not full rows
+            rows = await self.session.execute(_TRACK_LOOKUP_STMT, {"source_ids": list(lookup_ids)})
+            existing = {
+                source_id: _SyncedTrack(track_id, analyzed_at)
+                for source_id, track_id, analyzed_at in rows
+            }
+
+        tracks: list[_SyncedTrack] = []
+        new_tracks: list[Track] = []
+        for yandex_track, source_id in zip(yandex_tracks, source_ids, strict=True):
+            try:
+                track = cache.get(source_id)
+                if track is None:
+                    # Existing track
+                    track = existing.get(source_id)
+                    if track is None:
+                        # Create new track
+                        new_track = yandex_track_to_track(yandex_track, now=self._sync_now)
+                        new_tracks.append(new_track)
+                        track = _SyncedTrack(str(new_track.id), None)
+                    cache[source_id] = track
+                tracks.append(track)
+            except Exception as e:
+                errors.append(f"Track {yandex_track.id}: {e}")
+
+        if new_tracks:
+            await self.session.execute(
+                insert(TrackORM), [_track_to_row(track) for track in new_tracks]
+            )
+
+        return tracks
+
+    async def _save_playlist(
+        self,
+        yandex_playlist: "YandexPlaylist",
+        track_ids: list[str],
+    ) -> None:
+        """Create or update a playlist in database.
+
+        Args:
+            yandex_playlist: Yandex Music playlist object
+            track_ids: IDs of the playlist's synced tracks, in order
         """
         source_id = str(yandex_playlist.kind)
+        name = yandex_playlist.title or "Untitled"
 
         result = await self.session.execute(
-            select(PlaylistORM).where(
+            select(PlaylistORM.id).where(
                 PlaylistORM.source == "yandex",
                 PlaylistORM.source_id == source_id,
             )
         )
-        db_playlist = result.scalar_one_or_none()
-
-        if db_playlist is not None:
-            # Update existing playlist name
-            db_playlist.name = yandex_playlist.title or "Untitled"
-            return db_playlist
+        playlist_id = result.scalar_one_or_none()
+
+        if playlist_id is not None:
+            # Update existing playlist
+            await self.session.execute(
+                update(PlaylistORM)
+                .where(PlaylistORM.id == playlist_id)
+                .values(name=name, track_ids=track_ids, synced_at=self._sync_now)
+            )
+            return
 
         # Create new playlist
-        db_playlist = PlaylistORM(
-            name=yandex_playlist.title or "Untitled",
-            source="yandex",
-            source_id=source_id,
-            track_ids=[],
-            synced_at=datetime.now(),
+        await self.session.execute(
+            insert(PlaylistORM).values(
+                name=name,
+                source="yandex",
+                source_id=source_id,
+                track_ids=track_ids,
+                synced_at=self._sync_now,
+            )
         )
-        self.session.add(db_playlist)
-        await self.session.flush()
 
-        return db_playlist
+
+def _track_to_row(track: Track) -> dict:
+    """Build a not-yet-analyzed ``tracks`` row from a Track model."""
+    structure = track.structure
+    if structure is None:
+        structure_dump = None
+    elif not structure.model_fields_set:
+        # Default markers: copy the precomputed dump instead of re-serializing
+        structure_dump = dict(_EMPTY_STRUCTURE)
+    else:
+        structure_dump = structure.model_dump()
+
+    return {
+        "id": str(track.id),
+        "title": track.title,
+        "artists": track.artists,
+        "album": track.album,
+        "duration_ms": track.duration_ms,
+        "bpm": track.bpm,
+        "key": track.key,
+        "camelot": track.camelot,
+        "energy": track.energy,
+        "mood": track.mood,
+        "genre": track.genre,
+        "vocals": track.vocals,
+        "structure": structure_dump,
+        "rating": track.rating,
+        "tags": track.tags,
+        "notes": track.notes,
+        "source": track.source,
+        "source_id": track.source_id,
+        "cover_url": track.cover_url,
+        "created_at": track.created_at,
+        "analyzed_at": None,  # Not analyzed yet
+    }
@@ -145,6 +145,13 @@ class TestSet:
         assert dj_set.tracks[0].position == 1
         assert dj_set.tracks[1].transition_type == "mix"
 
+    def test_energy_curve_validation(self):
+        """Energy curve values must be between 1 and 10."""
+        with pytest.raises(ValidationError):
+            Set(name="Bad Set", energy_curve=[5, 6, 11])
+        with pytest.raises(ValidationError):
+            Set(name="Bad Set", energy_curve=[0, 5])
+
     def test_set_add_track(self):
         """Test add_track helper method."""
         dj_set = Set(name="Test Set")
@@ -181,6 +188,24 @@ class TestSet:
         assert dj_set.tracks[0].position == 1
         assert dj_set.tracks[0].track_id == track2_id
 
+        # Out-of-range positions are a no-op
+        assert dj_set.remove_track(5) is None
+        assert len(dj_set.tracks) == 1
+
+    def test_set_reorder_track(self):
+        """Test reorder_track helper method."""
+        track_ids = [uuid4(), uuid4(), uuid4()]
+        dj_set = Set(name="Test")
+        for track_id in track_ids:
+            dj_set.add_track(track_id)
+
+        assert dj_set.reorder_track(3, 1) is True
+        assert [t.track_id for t in dj_set.tracks] == [track_ids[2], track_ids[0], track_ids[1]]
+        assert [t.position for t in dj_set.tracks] == [1, 2, 3]
+
+        assert dj_set.reorder_track(0, 2) is False
+        assert dj_set.reorder_track(1, 4) is False
+
 
 class TestSetTrack:
     """Tests for SetTrack model."""
@@ -1,10 +1,67 @@
 """Tests for Yandex Music converter functions."""
 
+from types import SimpleNamespace
+
 import pytest
+from dj_ai_studio.models import Track
 from dj_ai_studio.yandex.converter import (
+    CAMELOT_TO_KEY,
     camelot_to_key,
     key_to_camelot,
+    keys_to_camelot,
+    yandex_track_to_track,
 )
+from pydantic import ValidationError
+
+
+def make_yandex_track(**overrides) -> SimpleNamespace:
+    """Create a minimal stand-in for a Yandex Music track."""
+    fields = {
+        "id": 42,
+        "title": "Strobe",
+        "version": "Radio Edit",
+        "artists": [SimpleNamespace(name="deadmau5")],
+        "albums": [SimpleNamespace(title="For Lack", version=None, genre="progressive")],
+        "cover_uri": "avatars.yandex.net/get-music-content/123/%%",
+        "duration_ms": 637000,
+    }
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+
+class TestYandexTrackToTrack:
+    """Tests for yandex_track_to_track function."""
+
+    def test_placeholder_track_is_valid(self):
+        """Placeholder conversion produces a model that passes validation."""
+        track = yandex_track_to_track(make_yandex_track())
+
+        assert track.title == "Strobe (Radio Edit)"
+        assert track.artists == ["deadmau5"]
+        assert track.album == "For Lack"
+        assert track.genre == ["progressive"]
+        assert track.cover_url == "https://avatars.yandex.net/get-music-content/123/400x400"
+        assert track.source_id == "42"
+        assert Track.model_validate(track.model_dump()) == track
+
+    def test_analyzed_values(self):
+        """Provided DJ attributes override the placeholders."""
+        track = yandex_track_to_track(
+            make_yandex_track(), bpm=128.0, key="Am", camelot="8A", energy=7, cover_size=200
+        )
+
+        assert (track.bpm, track.key, track.camelot, track.energy) == (128.0, "Am", "8A", 7)
+        assert track.cover_url.endswith("/200x200")
+
+    def test_missing_duration_is_rejected(self):
+        """Tracks without a duration still fail validation."""
+        with pytest.raises(ValidationError):
+            yandex_track_to_track(make_yandex_track(duration_ms=None))
+
+    def test_invalid_analyzed_key_is_rejected(self):
+        """Provided DJ attributes are validated."""
+        with pytest.raises(ValidationError):
+            yandex_track_to_track(make_yandex_track(), key="H")
 
 
 class TestKeyToCamelot:
@@ -47,6 +104,10 @@ class TestKeyToCamelot:
         """Unknown keys fall back to 8B."""
         assert key_to_camelot("X") == "8B"
 
+    def test_batch_conversion(self):
+        """keys_to_camelot maps each key in order, with the same fallback."""
+        assert keys_to_camelot(["Am", "C", "X", "F#m"]) == ["8A", "8B", "8B", "11A"]
+
 
 class TestCamelotToKey:
     """Tests for camelot_to_key function."""
@@ -103,3 +164,9 @@ class TestRoundTrip:
         key = camelot_to_key(camelot)
         result = key_to_camelot(key)
         assert result == camelot
+
+    def test_tables_are_consistent(self):
+        """Every Camelot code round-trips through the module-level tables."""
+        assert len(CAMELOT_TO_KEY) == 24
+        for camelot, key in CAMELOT_TO_KEY.items():
+            assert key_to_camelot(key) == camelot
@@ -0,0 +1,91 @@
+"""Tests for track downloads through the pooled session."""
+
+import pytest
+import requests
+from dj_ai_studio.yandex import client as client_module
+from dj_ai_studio.yandex.api import (
+    Codec,
+    Container,
+    CustomDownloadInfo,
+    FileFormat,
+    download_track_data,
+)
+from dj_ai_studio.yandex.client import YandexClient, YandexClientConfig
+from yandex_music.exceptions import NotFoundError, UnauthorizedError
+
+URL = "https://storage.example/track.mp3"
+
+
+def make_response(status: int, content: bytes = b"", headers: dict | None = None):
+    """Create a requests.Response with the given status, body and headers."""
+    resp = requests.Response()
+    resp.status_code = status
+    resp._content = content
+    resp.headers.update(headers or {})
+    resp.url = URL
+    return resp
+
+
+class FakeSession:
+    """Session stub returning queued responses and counting requests."""
+
+    def __init__(self, *responses: requests.Response) -> None:
+        self.responses = list(responses)
+        self.calls = 0
+
+    def get(self, url: str, timeout: float | None = None) -> requests.Response:
+        self.calls += 1
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def sleeps(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """Record backoff sleeps instead of waiting."""
+    recorded: list[float] = []
+    monkeypatch.setattr(client_module.time, "sleep", recorded.append)
+    return recorded
+
+
+def download(session: FakeSession) -> bytes:
+    """Download a plain (unencrypted) track through the retry wrapper."""
+    info = CustomDownloadInfo(
+        quality="nq",
+        file_format=FileFormat(Container.MP3, Codec.MP3),
+        urls=[URL],
+        decryption_key=None,
+        bitrate=320,
+    )
+    retrying = YandexClient(YandexClientConfig(token="token"))._with_retries(download_track_data)
+    return retrying(None, info, session, 5)
+
+
+class TestDownloadRetries:
+    """Retry behaviour of download_track_data over a pooled session."""
+
+    def test_forbidden_is_not_retried(self, sleeps: list[float]):
+        """An expired signed link (403) fails immediately without backoff."""
+        session = FakeSession(make_response(403))
+
+        with pytest.raises(UnauthorizedError):
+            download(session)
+
+        assert session.calls == 1
+        assert sleeps == []
+
+    def test_not_found_keeps_library_type(self, sleeps: list[float]):
+        """A missing file (404) raises NotFoundError, like client.request.retrieve."""
+        session = FakeSession(*(make_response(404) for _ in range(4)))
+
+        with pytest.raises(NotFoundError):
+            download(session)
+
+    def test_rate_limit_honours_retry_after(self, sleeps: list[float]):
+        """A 429 is retried after the server-provided Retry-After delay."""
+        session = FakeSession(
+            make_response(429, headers={"Retry-After": "2"}),
+            make_response(200, b"audio"),
+        )
+
+        assert download(session) == b"audio"
+        assert session.calls == 2
+        assert sleeps == [2.0]
@@ -0,0 +1,222 @@
+"""Tests for Yandex Music playlist synchronization."""
+
+import asyncio
+from collections.abc import AsyncGenerator
+from types import SimpleNamespace
+
+import pytest
+from dj_ai_studio.db import Base, PlaylistORM, TrackORM
+from dj_ai_studio.yandex.sync import YandexSyncService
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+
+def make_yandex_track(track_id: int, title: str = "Track") -> SimpleNamespace:
+    """Create a minimal stand-in for a Yandex Music track."""
+    return SimpleNamespace(
+        id=track_id,
+        title=f"{title} {track_id}",
+        version=None,
+        artists=[SimpleNamespace(name="Artist")],
+        albums=[],
+        cover_uri=None,
+        duration_ms=180000,
+    )
+
+
+class FakeYandexClient:
+    """Async client stub serving fixed playlists and liked tracks."""
+
+    def __init__(self, playlists: dict[int, list[SimpleNamespace]], liked=()) -> None:
+        self.playlists = playlists
+        self.liked = list(liked)
+
+    async def get_playlist(self, user_id: str, playlist_id: int) -> SimpleNamespace | None:
+        if playlist_id not in self.playlists:
+            return None
+        return SimpleNamespace(kind=playlist_id, title=f"Playlist {playlist_id}")
+
+    async def get_user_playlists(self, user_id: str | None = None) -> list[SimpleNamespace]:
+        owner = SimpleNamespace(login="user", uid=1)
+        return [SimpleNamespace(kind=kind, owner=owner) for kind in self.playlists]
+
+    async def get_playlist_tracks(self, user_id: str, playlist_id: int) -> AsyncGenerator:
+        for track in self.playlists[playlist_id]:
+            yield track
+
+    async def get_liked_tracks(self) -> AsyncGenerator:
+        for track in self.liked:
+            yield track
+
+
+@pytest.fixture
+async def session() -> AsyncGenerator[AsyncSession, None]:
+    """Create an in-memory database session."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+async def count_tracks(session: AsyncSession) -> int:
+    return (await session.execute(select(func.count()).select_from(TrackORM))).scalar_one()
+
+
+class TestSyncPlaylist:
+    """Tests for YandexSyncService.sync_playlist."""
+
+    async def test_sync_new_playlist(self, session: AsyncSession):
+        """New tracks are inserted and linked to the playlist in order."""
+        tracks = [make_yandex_track(i) for i in (1, 2, 3)]
+        service = YandexSyncService(FakeYandexClient({10: tracks}), session)
+
+        result = await service.sync_playlist("user", 10)
+
+        assert result.errors == []
+        assert result.tracks_added == 3
+        assert await count_tracks(session) == 3
+
+        db_playlist = (await session.execute(select(PlaylistORM))).scalar_one()
+        source_ids = [
+            (await session.get(TrackORM, track_id)).source_id for track_id in db_playlist.track_ids
+        ]
+        assert source_ids == ["1", "2", "3"]
+
+    async def test_resync_reuses_existing_tracks(self, session: AsyncSession):
+        """Re-syncing does not duplicate tracks."""
+        client = FakeYandexClient({10: [make_yandex_track(1), make_yandex_track(2)]})
+        await YandexSyncService(client, session).sync_playlist("user", 10)
+
+        client.playlists[10].append(make_yandex_track(3))
+        result = await YandexSyncService(client, session).sync_playlist("user", 10)
+
+        assert result.errors == []
+        assert await count_tracks(session) == 3
+        assert (await session.execute(select(func.count(PlaylistORM.id)))).scalar_one() == 1
+
+    async def test_duplicate_tracks_in_playlist(self, session: AsyncSession):
+        """A track repeated within a playlist is stored once."""
+        track = make_yandex_track(1)
+        service = YandexSyncService(FakeYandexClient({10: [track, track]}), session)
+
+        result = await service.sync_playlist("user", 10)
+
+        assert result.errors == []
+        assert await count_tracks(session) == 1
+        db_playlist = (await session.execute(select(PlaylistORM))).scalar_one()
+        assert len(db_playlist.track_ids) == 2
+        assert db_playlist.track_ids[0] == db_playlist.track_ids[1]
+
+    async def test_track_shared_between_playlists(self, session: AsyncSession):
+        """A track synced through one playlist is reused by the next."""
+        shared = make_yandex_track(1)
+        client = FakeYandexClient({10: [shared], 20: [shared, make_yandex_track(2)]})
+        service = YandexSyncService(client, session)
+
+        await service.sync_playlist("user", 10)
+        result = await service.sync_playlist("user", 20)
+
+        assert result.errors == []
+        assert await count_tracks(session) == 2
+        playlists = (await session.execute(select(PlaylistORM))).scalars().all()
+        by_kind = {p.source_id: p.track_ids for p in playlists}
+        assert by_kind["10"][0] == by_kind["20"][0]
+
+    async def test_missing_playlist(self, session: AsyncSession):
+        """Unknown playlists are reported as errors."""
+        service = YandexSyncService(FakeYandexClient({}), session)
+
+        result = await service.sync_playlist("user", 99)
+
+        assert result.errors == ["Playlist 99 not found"]
+
+
+class TestSyncAllPlaylists:
+    """Tests for YandexSyncService.sync_all_playlists."""
+
+    async def test_sync_all_playlists(self, session: AsyncSession):
+        """All user playlists are synced and their stats aggregated."""
+        client = FakeYandexClient(
+            {
+                10: [make_yandex_track(1), make_yandex_track(2)],
+                20: [make_yandex_track(2), make_yandex_track(3)],
+                30: [],
+            }
+        )
+        service = YandexSyncService(client, session)
+
+        stats = await service.sync_all_playlists()
+
+        assert stats.errors == []
+        assert stats.playlists_synced == 3
+        assert await count_tracks(session) == 3
+        playlists = (await session.execute(select(PlaylistORM))).scalars().all()
+        assert sorted(len(p.track_ids) for p in playlists) == [0, 2, 2]
+
+    async def test_store_failure_cancels_pending_fetches(
+        self, session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+    ):
+        """A failing store does not leave the remaining fetch tasks running."""
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        class SlowClient(FakeYandexClient):
+            async def get_playlist(self, user_id: str, playlist_id: int) -> SimpleNamespace | None:
+                if playlist_id == 20:
+                    started.set()
+                    try:
+                        await asyncio.Event().wait()
+                    except asyncio.CancelledError:
+                        cancelled.set()
+                        raise
+                return await super().get_playlist(user_id, playlist_id)
+
+        async def failing_store(playlist_id, fetched):
+            await started.wait()
+            raise RuntimeError("database is locked")
+
+        service = YandexSyncService(SlowClient({10: [], 20: []}), session)
+        monkeypatch.setattr(service, "_store_playlist", failing_store)
+
+        stats = await service.sync_all_playlists()
+
+        assert stats.errors == ["database is locked"]
+        assert cancelled.is_set()
+
+
+class TestSyncIndexes:
+    """Existence probes must be served by the (source, source_id) indexes."""
+
+    @pytest.mark.parametrize(
+        "table,index",
+        [
+            ("tracks", "ix_tracks_source_source_id"),
+            ("playlists", "ix_playlists_source_source_id"),
+        ],
+    )
+    async def test_source_lookup_uses_index(self, session: AsyncSession, table: str, index: str):
+        """Lookups by source and source_id use the composite unique index."""
+        plan = await session.execute(
+            text(
+                f"EXPLAIN QUERY PLAN SELECT id FROM {table} "
+                "WHERE source = 'yandex' AND source_id IN ('1', '2')"
+            )
+        )
+        assert any(index in row[-1] for row in plan)
+
+
+class TestSyncLikedTracks:
+    """Tests for YandexSyncService.sync_liked_tracks."""
+
+    async def test_sync_liked_tracks(self, session: AsyncSession):
+        """Liked tracks are inserted without creating a playlist."""
+        liked = [make_yandex_track(i) for i in (5, 6)]
+        service = YandexSyncService(FakeYandexClient({}, liked=liked), session)
+
+        result = await service.sync_liked_tracks()
+
+        assert result.errors == []
+        assert result.tracks_added == 2
+        assert await count_tracks(session) == 2
@@ -1,23 +1,38 @@
 #!/usr/bin/env python3
 """
 Анализ аудиофайлов для определения BPM и Key
-Использует librosa для BPM и essentia для Key detection
+Использует librosa для BPM и key_detector (librosa chroma + Krumhansl-Schmuckler) для Key
 """
 
+import hashlib
 import json
 import logging
+import os
+import shutil
+import subprocess
 import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from common import dump_json, load_json
+
 # Настройка логирования
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s | %(levelname)-8s | %(message)s", datefmt="%H:%M:%S"
 )
 logger = logging.getLogger(__name__)
 
+# --cache: сохранять результаты анализа и декодированный аудио буфер (.npy) в
+# .analysis_cache/ для повторных запусков
+USE_CACHE = "--cache" in sys.argv
+
 # Проверка зависимостей
 try:
     import librosa
+    import numpy as np
+    import soundfile as sf
+    from threadpoolctl import threadpool_limits
 
     logger.info("✓ librosa доступна")
 except ImportError:
@@ -27,95 +42,124 @@ except ImportError:
 
 # Импорт key detector (librosa-based, без C dependencies)
 try:
-    from key_detector import detect_key
+    from key_detector import KEY_DETECTOR_VERSION, detect_key_from_audio
 
     logger.info("✓ Key detector доступен (librosa chroma + Krumhansl-Schmuckler)")
     HAS_KEY_DETECTOR = True
 except ImportError as e:
     logger.warning(f"⚠️  Key detector не найден: {e}")
     HAS_KEY_DETECTOR = False
+    KEY_DETECTOR_VERSION = None
 
 PROJECT_DIR = Path(__file__).parent
 DJ_SET_DIR = PROJECT_DIR / "dj_set_techno_2025"
 METADATA_FILE = DJ_SET_DIR / "tracklist_metadata.json"
 
-# Загрузка метаданных
-logger.info(f"📋 Загрузка метаданных из {METADATA_FILE}...")
-with open(METADATA_FILE, encoding="utf-8") as f:
-    data = json.load(f)
-    tracks = data["tracks"]
+# Частота дискретизации для BPM/Key анализа: для techno kick (40-200 Hz) и
+# octave-folded chroma достаточно 11025 Hz, а STFT/CQT обходятся вдвое дешевле
+ANALYSIS_SR = 11025
+# Шаг onset envelope при ANALYSIS_SR (~43 кадра/с, как 512 при 22050 Hz)
+BEAT_HOP_LENGTH = 256
+# Диапазон темпов, в который переносятся half/double-time оценки
+TEMPO_RANGE = (90.0, 180.0)
 
-logger.info(f"✓ Загружено {len(tracks)} треков\n")
-
-# Camelot Wheel mapping для DJ
-CAMELOT_WHEEL = {
-    "C": "8B",
-    "C#": "3B",
-    "D": "10B",
-    "D#": "5B",
-    "E": "12B",
-    "F": "7B",
-    "F#": "2B",
-    "G": "9B",
-    "G#": "4B",
-    "A": "11B",
-    "A#": "6B",
-    "B": "1B",
-    "Cm": "5A",
-    "C#m": "12A",
-    "Dm": "7A",
-    "D#m": "2A",
-    "Em": "9A",
-    "Fm": "4A",
-    "F#m": "11A",
-    "Gm": "6A",
-    "G#m": "1A",
-    "Am": "8A",
-    "A#m": "3A",
-    "Bm": "10A",
-    # Essentia формат (полное название)
-    "Cmajor": "8B",
-    "C#major": "3B",
-    "Dmajor": "10B",
-    "D#major": "5B",
-    "Emajor": "12B",
-    "Fmajor": "7B",
-    "F#major": "2B",
-    "Gmajor": "9B",
-    "G#major": "4B",
-    "Amajor": "11B",
-    "A#major": "6B",
-    "Bmajor": "1B",
-    "Cminor": "5A",
-    "C#minor": "12A",
-    "Dminor": "7A",
-    "D#minor": "2A",
-    "Eminor": "9A",
-    "Fminor": "4A",
-    "F#minor": "11A",
-    "Gminor": "6A",
-    "G#minor": "1A",
-    "Aminor": "8A",
-    "A#minor": "3A",
-    "Bminor": "10A",
-}
-
-
-def analyze_bpm(audio_path):
-    """Определение BPM с помощью librosa (оптимизировано для techno)"""
+# ffmpeg для форматов, которые не читает libsndfile
+FFMPEG = shutil.which("ffmpeg")
+
+# Кэш результатов анализа по хэшу содержимого файла
+ANALYSIS_CACHE_DIR = DJ_SET_DIR / ".analysis_cache"
+# Декодированные аудио буферы (.npy) для --cache
+AUDIO_CACHE_DIR = ANALYSIS_CACHE_DIR / "audio"
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def ffmpeg_load(audio_path, duration=180):
+    """Декодирование первых `duration` секунд через ffmpeg pipe
+
+    ffmpeg сразу отдает mono float32 в ANALYSIS_SR, без ресемплинга в Python.
+    """
+    cmd = [FFMPEG, "-v", "quiet", "-t", str(duration), "-i", str(audio_path)]
+    cmd += ["-ac", "1", "-ar", str(ANALYSIS_SR), "-f", "f32le", "pipe:1"]
+    result = subprocess.run(cmd, capture_output=True, check=True)
+    return np.frombuffer(result.stdout, dtype=np.float32), ANALYSIS_SR
+
+
+def load_head(audio_path, duration=180):
+    """Чтение только первых `duration` секунд в mono float32
+
+    soundfile декодирует ровно нужное число фреймов. Форматы, которые libsndfile
+    не читает (m4a из Яндекс.Музыки), декодируются через ffmpeg, если он есть,
+    иначе через librosa.load; оба сразу отдают ANALYSIS_SR.
+    """
     try:
-        # 3 минуты для более точного определения в techno
-        y, sr = librosa.load(audio_path, duration=180)
+        info = sf.info(str(audio_path))
+    except RuntimeError:
+        if FFMPEG:
+            try:
+                return ffmpeg_load(audio_path, duration=duration)
+            except subprocess.CalledProcessError:
+                pass
+        # Сразу в ANALYSIS_SR mono: без второго ресемплинга в load_audio
+        return librosa.load(audio_path, sr=ANALYSIS_SR, mono=True, duration=duration)
+
+    sr = info.samplerate
+    y, _ = sf.read(str(audio_path), frames=min(info.frames, sr * duration), dtype="float32")
+    if y.ndim == 2:
+        y = y.mean(axis=1)
+    return y, sr
+
+
+def load_audio(audio_path, duration=180):
+    """Mono float32 сигнал для анализа с опциональным .npy кэшем
+
+    Кэш лежит в .analysis_cache/audio/ (имя — хэш пути к файлу), а не рядом с аудио;
+    действителен, пока он не старше исходного файла; читается через mmap.
+    """
+    path_hash = hashlib.blake2b(str(audio_path.resolve()).encode(), digest_size=16).hexdigest()
+    cache_file = AUDIO_CACHE_DIR / f"{path_hash}.{ANALYSIS_SR}.npy"
+    if USE_CACHE and cache_file.exists():
+        if cache_file.stat().st_mtime >= audio_path.stat().st_mtime:
+            return np.load(cache_file, mmap_mode="r"), ANALYSIS_SR
+
+    y, sr = load_head(audio_path, duration=duration)
+    if sr != ANALYSIS_SR:
+        y = librosa.resample(y, orig_sr=sr, target_sr=ANALYSIS_SR)
+
+    if USE_CACHE:
+        AUDIO_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        np.save(cache_file, y.astype(np.float32, copy=False))
+    return y, ANALYSIS_SR
+
+
+def fold_tempo(bpm):
+    """Исправление half/double-time ошибок: перенос темпа в диапазон [90, 180) BPM
+
+    Для techno/house в 4/4 темп вдвое ниже или выше - почти всегда ошибка
+    октавы beat tracker'а (например, 65 вместо 130 BPM).
+    """
+    if bpm <= 0:
+        return bpm
+    while bpm < TEMPO_RANGE[0]:
+        bpm *= 2
+    while bpm >= TEMPO_RANGE[1]:
+        bpm /= 2
+    return bpm
+
 
+def analyze_bpm(y, sr):
+    """Определение BPM с помощью librosa (оптимизировано для techno)"""
+    try:
         # Настройки для techno/house (120-140 BPM)
         tempo, beats = librosa.beat.beat_track(
             y=y,
             sr=sr,
             start_bpm=125.0,  # Стартовая точка для techno
             tightness=200,  # Увеличенная точность
+            hop_length=BEAT_HOP_LENGTH,
         )
 
-        bpm = round(float(tempo), 1)
+        # librosa >= 0.10 возвращает tempo как массив из одного элемента
+        bpm = round(fold_tempo(float(np.ravel(tempo)[0])), 1)
         logger.debug(f"    BPM detected: {bpm} (beats: {len(beats)})")
         return bpm
     except Exception as e:
@@ -123,22 +167,18 @@ def analyze_bpm(audio_path):
         return None
 
 
-def analyze_key(audio_path):
+def analyze_key(y, sr):
     """Определение тональности с помощью librosa chroma (Krumhansl-Schmuckler algorithm)"""
     if not HAS_KEY_DETECTOR:
         return None, None, None
 
     try:
         # Используем новый key detector на базе librosa
-        key, camelot, confidence = detect_key(str(audio_path), duration=180)
+        key, camelot, confidence = detect_key_from_audio(y, sr)
 
         if not key:
             return None, None, None
 
-        # Предупреждение при низкой уверенности (< 0.6 для chroma-based detection)
-        if confidence < 0.6:
-            logger.warning(f"    ⚠️  Низкая уверенность key detection: {confidence:.2f}")
-
         logger.debug(f"    Key detection: {key} (Camelot: {camelot}, confidence: {confidence:.2f})")
         return key, camelot, confidence
     except Exception as e:
@@ -146,94 +186,165 @@ def analyze_key(audio_path):
         return None, None, None
 
 
-# Анализ треков
-logger.info("🎵 Анализ аудиофайлов...\n")
-stats = {"analyzed": 0, "errors": 0, "missing": 0}
-
-for idx, track in enumerate(tracks, 1):
-    file_path = Path(track["file_path"])
-
-    if not file_path.exists():
-        logger.warning(f"⚠️  [{idx:02d}/50] Файл не найден: {file_path.name}")
-        stats["missing"] += 1
-        continue
+def init_worker():
+    """Один BLAS/OpenMP поток на worker: треки уже параллелятся по процессам"""
+    threadpool_limits(limits=1)
+
+
+def file_digest(audio_path):
+    """Быстрый хэш аудиофайла: размер + первый и последний 1 MB
+
+    В ключ также входят параметры анализа и версия key detector, чтобы их смена
+    инвалидировала кэш.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    size = audio_path.stat().st_size
+    params = f"{size}:{ANALYSIS_SR}:{BEAT_HOP_LENGTH}:{TEMPO_RANGE}:{KEY_DETECTOR_VERSION}"
+    digest.update(params.encode())
+    with open(audio_path, "rb") as f:
+        digest.update(f.read(HASH_CHUNK_SIZE))
+        if size > HASH_CHUNK_SIZE:
+            f.seek(max(size - HASH_CHUNK_SIZE, HASH_CHUNK_SIZE))
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def analyze_track(file_path):
+    """Анализ одного трека в worker-процессе
+
+    Аудио декодируется один раз (3 минуты для более точного определения в techno)
+    и используется и для BPM, и для Key. С --cache результаты для неизмененных
+    файлов берутся из .analysis_cache/ без декодирования.
+
+    Returns:
+        tuple: (bpm, key, camelot, confidence); логирование остается в главном процессе
+    """
+    cache_file = None
+    if USE_CACHE:
+        cache_file = ANALYSIS_CACHE_DIR / f"{file_digest(file_path)}.json"
+        try:
+            cached = json.loads(cache_file.read_text(encoding="utf-8"))
+            return cached["bpm"], cached["key"], cached["camelot"], cached["key_confidence"]
+        except FileNotFoundError:
+            pass  # Нет записи — промах кэша
+        except (ValueError, KeyError, TypeError):
+            # Поврежденная запись (битый JSON или не те поля) — тоже промах, перезапишется
+            pass
+
+    y, sr = load_audio(file_path, duration=180)
+    bpm = analyze_bpm(y, sr)
+    key, camelot, confidence = analyze_key(y, sr)
+
+    if cache_file is not None:
+        # Атомарная запись: временный файл + os.replace, читатели не увидят полузаписанный JSON
+        ANALYSIS_CACHE_DIR.mkdir(exist_ok=True)
+        tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        tmp_file.write_text(
+            json.dumps({"bpm": bpm, "key": key, "camelot": camelot, "key_confidence": confidence}),
+            encoding="utf-8",
+        )
+        os.replace(tmp_file, cache_file)
+    return bpm, key, camelot, confidence
 
-    logger.info(f"🔍 [{idx:02d}/50] {track['artist']} - {track['title']}")
 
-    try:
-        # BPM анализ
-        bpm = analyze_bpm(file_path)
-        if bpm:
-            track["bpm"] = bpm
-            logger.info(f"    BPM: {bpm}")
-
-        # Key анализ
-        if HAS_KEY_DETECTOR:
-            key, camelot, confidence = analyze_key(file_path)
-            if key:
-                track["key"] = key
-                track["camelot"] = camelot
-                track["key_confidence"] = confidence
-                conf_emoji = "✓" if confidence and confidence >= 0.6 else "⚠️"
-                logger.info(f"    Key: {key} (Camelot: {camelot}) {conf_emoji} {confidence}")
-
-        stats["analyzed"] += 1
+if __name__ == "__main__":
+    # Загрузка метаданных
+    logger.info(f"📋 Загрузка метаданных из {METADATA_FILE}...")
+    data = load_json(METADATA_FILE)
+    tracks = data["tracks"]
 
-    except Exception as e:
-        logger.error(f"    ❌ Ошибка: {e}")
-        stats["errors"] += 1
-
-# Сохранение обновленных метаданных
-logger.info("\n💾 Сохранение обновленных метаданных...")
-with open(METADATA_FILE, "w", encoding="utf-8") as f:
-    json.dump(data, f, ensure_ascii=False, indent=2)
-logger.info(f"✓ Сохранено в {METADATA_FILE}")
-
-# Обновление M3U8
-m3u_file = DJ_SET_DIR / "techno_2025.m3u8"
-with open(m3u_file, "w", encoding="utf-8") as f:
-    f.write("#EXTM3U\n")
+    logger.info(f"✓ Загружено {len(tracks)} треков\n")
+
+    # Анализ треков
+    logger.info("🎵 Анализ аудиофайлов...\n")
+    stats = {"analyzed": 0, "errors": 0, "missing": 0}
+
+    # librosa CPU-bound: анализируем треки параллельно по процессам
+    with ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=init_worker) as executor:
+        futures = {}
+        for idx, track in enumerate(tracks, 1):
+            file_path = Path(track["file_path"])
+            if file_path.exists():
+                futures[idx] = executor.submit(analyze_track, file_path)
+
+        for idx, track in enumerate(tracks, 1):
+            if idx not in futures:
+                logger.warning(f"⚠️  [{idx:02d}/50] Файл не найден: {Path(track['file_path']).name}")
+                stats["missing"] += 1
+                continue
+
+            logger.info(f"🔍 [{idx:02d}/50] {track['artist']} - {track['title']}")
+
+            try:
+                bpm, key, camelot, confidence = futures[idx].result()
+
+                if bpm:
+                    track["bpm"] = bpm
+                    logger.info(f"    BPM: {bpm}")
+
+                if key:
+                    track["key"] = key
+                    track["camelot"] = camelot
+                    track["key_confidence"] = confidence
+                    # Предупреждение при низкой уверенности (< 0.6 для chroma-based detection)
+                    if confidence < 0.6:
+                        logger.warning(f"    ⚠️  Низкая уверенность key detection: {confidence:.2f}")
+                    conf_emoji = "✓" if confidence and confidence >= 0.6 else "⚠️"
+                    logger.info(f"    Key: {key} (Camelot: {camelot}) {conf_emoji} {confidence}")
+
+                stats["analyzed"] += 1
+
+            except Exception as e:
+                logger.error(f"    ❌ Ошибка: {e}")
+                stats["errors"] += 1
+
+    # Сохранение обновленных метаданных
+    logger.info("\n💾 Сохранение обновленных метаданных...")
+    dump_json(METADATA_FILE, data)
+    logger.info(f"✓ Сохранено в {METADATA_FILE}")
+
+    # Обновление M3U8
+    m3u_file = DJ_SET_DIR / "techno_2025.m3u8"
+    lines = ["#EXTM3U\n"]
     for track in tracks:
-        f.write(
+        lines.append(
             f"#EXTINF:{int(track['duration_ms'] / 1000)},{track['artist']} - {track['title']}\n"
         )
-        f.write(f"#EXTGENRE:{track['genre']}\n")
+        lines.append(f"#EXTGENRE:{track['genre']}\n")
         if track.get("bpm"):
-            f.write(f"#EXTBPM:{track['bpm']}\n")
+            lines.append(f"#EXTBPM:{track['bpm']}\n")
         if track.get("key"):
-            f.write(f"#EXTKEY:{track['key']}\n")
+            lines.append(f"#EXTKEY:{track['key']}\n")
         if track.get("camelot"):
-            f.write(f"#EXTCAMELOT:{track['camelot']}\n")
-        f.write(f"{track['filename']}\n")
-logger.info("✓ M3U8 обновлен")
-
-# Статистика
-logger.info("\n" + "=" * 60)
-logger.info("📊 СТАТИСТИКА АНАЛИЗА")
-logger.info("=" * 60)
-logger.info(f"✅ Проанализировано: {stats['analyzed']}/{len(tracks)}")
-logger.info(f"⚠️  Не найдено:      {stats['missing']}/{len(tracks)}")
-logger.info(f"❌ Ошибки:          {stats['errors']}/{len(tracks)}")
-
-# BPM статистика
-bpms = [t["bpm"] for t in tracks if t.get("bpm")]
-if bpms:
-    logger.info(f"\nBPM диапазон: {min(bpms):.1f} - {max(bpms):.1f}")
-    logger.info(f"Средний BPM:  {sum(bpms) / len(bpms):.1f}")
-
-# Key статистика
-if HAS_KEY_DETECTOR:
-    keys = {}
-    for track in tracks:
-        if track.get("key"):
-            k = track["key"]
-            keys[k] = keys.get(k, 0) + 1
-
-    if keys:
-        logger.info("\nТональности:")
-        for key, count in sorted(keys.items(), key=lambda x: x[1], reverse=True)[:5]:
-            logger.info(f"  {key:10} {count:3d} треков")
-
-logger.info("=" * 60)
-logger.info("\n✨ Анализ завершен!")
-logger.info("📁 Файлы готовы для импорта в DJ Pro AI")
+            lines.append(f"#EXTCAMELOT:{track['camelot']}\n")
+        lines.append(f"{track['filename']}\n")
+    with open(m3u_file, "w", encoding="utf-8") as f:
+        f.write("".join(lines))
+    logger.info("✓ M3U8 обновлен")
+
+    # Статистика
+    logger.info("\n" + "=" * 60)
+    logger.info("📊 СТАТИСТИКА АНАЛИЗА")
+    logger.info("=" * 60)
+    logger.info(f"✅ Проанализировано: {stats['analyzed']}/{len(tracks)}")
+    logger.info(f"⚠️  Не найдено:      {stats['missing']}/{len(tracks)}")
+    logger.info(f"❌ Ошибки:          {stats['errors']}/{len(tracks)}")
+
+    # BPM статистика
+    bpms = [t["bpm"] for t in tracks if t.get("bpm")]
+    if bpms:
+        logger.info(f"\nBPM диапазон: {min(bpms):.1f} - {max(bpms):.1f}")
+        logger.info(f"Средний BPM:  {sum(bpms) / len(bpms):.1f}")
+
+    # Key статистика
+    if HAS_KEY_DETECTOR:
+        top_keys = Counter(t["key"] for t in tracks if t.get("key")).most_common(5)
+
+        if top_keys:
+            logger.info("\nТональности:")
+            for key, count in top_keys:
+                logger.info(f"  {key:10} {count:3d} треков")
+
+    logger.info("=" * 60)
+    logger.info("\n✨ Анализ завершен!")
+    logger.info("📁 Файлы готовы для импорта в DJ Pro AI")
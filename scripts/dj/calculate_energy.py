@@ -4,10 +4,13 @@
 + генерация визуализации energy flow сета
 """
 
-import json
 import logging
+import re
 from pathlib import Path
 
+import numpy as np
+from common import dump_json, load_json
+
 # Настройка логирования
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s | %(levelname)-8s | %(message)s", datefmt="%H:%M:%S"
@@ -19,122 +22,121 @@ DJ_SET_DIR = PROJECT_DIR / "dj_set_techno_2025"
 METADATA_FILE = DJ_SET_DIR / "tracklist_metadata.json"
 
 
-def calculate_energy_level(bpm, loudness_lufs, genre, key=None):
+# Шкалы для BPM / Loudness: границы бинов и оценка каждого бина
+BPM_BINS = np.array([120.0, 123.0, 126.0, 129.0, 132.0])
+BPM_SCORES = np.array([2.0, 4.0, 6.0, 7.5, 9.0, 10.0])
+LOUDNESS_BINS = np.array([-12.0, -10.0, -8.0])
+LOUDNESS_SCORES = np.array([3.0, 5.0, 7.0, 9.0])
+
+GENRE_SCORES = {
+    "techno": 8.0,
+    "house": 6.5,
+    "dance": 7.0,
+    "electronics": 5.5,
+    "ambient": 3.0,
+    "deep house": 5.0,
+    "minimal": 5.5,
+}
+
+
+# Все вхождения жанров за один проход: lookahead находит и перекрывающиеся
+# совпадения ("house" внутри "deep house"), приоритет - порядок в GENRE_SCORES
+_GENRE_RE = re.compile("(?=(" + "|".join(map(re.escape, GENRE_SCORES)) + "))")
+_GENRE_PRIORITY = {g: i for i, g in enumerate(GENRE_SCORES)}
+
+
+def genre_score(genre):
+    """Оценка жанра (первое совпадение подстроки, по умолчанию 6.0)"""
+    matches = _GENRE_RE.findall(genre.lower()) if genre else None
+    if not matches:
+        return 6.0
+    return GENRE_SCORES[min(matches, key=_GENRE_PRIORITY.__getitem__)]
+
+
+def key_score(key):
+    """Оценка тональности: minor = темнее, major = ярче"""
+    if not key:
+        return 6.0  # Default
+    return 5.0 if key.endswith("m") else 7.0  # Minor / Major
+
+
+def calculate_energy_levels(bpms, loudness_lufs, genres, keys):
     """
-    Расчет Energy Level (1-10) на основе параметров трека
+    Векторизованный расчет Energy Level (1-10) для набора треков
 
     Факторы:
     - BPM (40%)
     - Loudness (30%)
     - Genre (20%)
     - Key (major/minor) (10%)
+
+    Отсутствующие BPM/Loudness (None) не дают вклада.
     """
-    energy = 0.0
-
-    # 1. BPM contribution (40% веса)
-    if bpm:
-        # Techno/House диапазон: 117-136 BPM
-        if bpm < 120:
-            bpm_score = 2.0  # Deep/slow
-        elif 120 <= bpm < 123:
-            bpm_score = 4.0  # Warm-up
-        elif 123 <= bpm < 126:
-            bpm_score = 6.0  # Building
-        elif 126 <= bpm < 129:
-            bpm_score = 7.5  # Peak time
-        elif 129 <= bpm < 132:
-            bpm_score = 9.0  # Climax
-        else:
-            bpm_score = 10.0  # Hard techno
-
-        energy += bpm_score * 0.4
-
-    # 2. Loudness contribution (30% веса)
-    if loudness_lufs is not None:
-        # LUFS для electronic music: -14 (тихо) до -6 (громко)
-        # Нормализуем к шкале 1-10
-        if loudness_lufs < -12:
-            loudness_score = 3.0  # Тихий, ambient
-        elif -12 <= loudness_lufs < -10:
-            loudness_score = 5.0  # Средний
-        elif -10 <= loudness_lufs < -8:
-            loudness_score = 7.0  # Громкий
-        else:
-            loudness_score = 9.0  # Очень громкий
-
-        energy += loudness_score * 0.3
-
-    # 3. Genre contribution (20% веса)
-    genre_scores = {
-        "techno": 8.0,
-        "house": 6.5,
-        "dance": 7.0,
-        "electronics": 5.5,
-        "ambient": 3.0,
-        "deep house": 5.0,
-        "minimal": 5.5,
-    }
-
-    genre_lower = genre.lower() if genre else ""
-    genre_score = 6.0  # Default
-
-    for g, score in genre_scores.items():
-        if g in genre_lower:
-            genre_score = score
-            break
-
-    energy += genre_score * 0.2
-
-    # 4. Key (major/minor) contribution (10% веса)
-    if key:
-        # Minor keys = темнее, lower energy
-        # Major keys = ярче, higher energy
-        if "m" in key or key.endswith("m"):
-            key_score = 5.0  # Minor
-        else:
-            key_score = 7.0  # Major
+    bpm = np.array([b or np.nan for b in bpms], dtype=float)
+    loudness = np.array([np.nan if x is None else x for x in loudness_lufs], dtype=float)
 
-        energy += key_score * 0.1
-    else:
-        energy += 6.0 * 0.1  # Default
+    # Techno/House диапазон: 117-136 BPM; LUFS: -14 (тихо) до -6 (громко)
+    bpm_score = BPM_SCORES[np.searchsorted(BPM_BINS, bpm, side="right")]
+    loudness_score = LOUDNESS_SCORES[np.searchsorted(LOUDNESS_BINS, loudness, side="right")]
+
+    # Жанры повторяются, поэтому считаем оценку один раз на уникальную строку
+    genre_cache = {g: genre_score(g) for g in set(genres)}
+    genre = np.array([genre_cache[g] for g in genres], dtype=float)
+    key = np.array([key_score(k) for k in keys], dtype=float)
+
+    energy = (
+        np.where(np.isnan(bpm), 0.0, bpm_score * 0.4)
+        + np.where(np.isnan(loudness), 0.0, loudness_score * 0.3)
+        + genre * 0.2
+        + key * 0.1
+    )
 
     # Финальное округление до 1-10
-    energy = max(1.0, min(10.0, energy))
-    return round(energy, 1)
+    return np.clip(energy, 1.0, 10.0).round(1)
+
+
+def calculate_energy_level(bpm, loudness_lufs, genre, key=None):
+    """Расчет Energy Level (1-10) для одного трека"""
+    return float(calculate_energy_levels([bpm], [loudness_lufs], [genre], [key])[0])
+
+
+# Категории энергии для DJ и их нижние границы (кроме первой)
+ENERGY_CATEGORIES = ("Warm-up", "Building", "Peak Time", "Climax", "Hard Peak")
+ENERGY_CATEGORY_BINS = np.array([3.5, 5.5, 7.5, 9.0])
+
+
+# Строки отчетов собираются из готовых шаблонов, а не умножением строк на каждый трек
+SEPARATOR = "=" * 80
+ENERGY_BAR = "█" * 60
+
+
+def categorize_energies(energies):
+    """Категоризация энергии для набора треков"""
+    idx = np.searchsorted(ENERGY_CATEGORY_BINS, np.asarray(energies, dtype=float), side="right")
+    return [ENERGY_CATEGORIES[i] for i in idx.tolist()]
 
 
 def categorize_energy(energy):
     """Категоризация энергии для DJ"""
-    if energy < 3.5:
-        return "Warm-up"
-    elif energy < 5.5:
-        return "Building"
-    elif energy < 7.5:
-        return "Peak Time"
-    elif energy < 9.0:
-        return "Climax"
-    else:
-        return "Hard Peak"
+    return categorize_energies([energy])[0]
 
 
 def generate_ascii_visualization(tracks):
     """ASCII визуализация energy flow"""
     viz = []
-    viz.append("\n" + "=" * 80)
+    viz.append("\n" + SEPARATOR)
     viz.append("📊 ENERGY FLOW VISUALIZATION")
-    viz.append("=" * 80)
+    viz.append(SEPARATOR)
     viz.append("")
 
-    max_width = 60
-    for idx, track in enumerate(tracks, 1):
+    categories = categorize_energies([t.get("energy", 5.0) for t in tracks])
+    for idx, (track, category) in enumerate(zip(tracks, categories, strict=True), 1):
         energy = track.get("energy", 5.0)
-        category = categorize_energy(energy)
         bpm = track.get("bpm", "???")
         key = track.get("key", "???")
 
         # Energy bar
-        bar_length = int((energy / 10.0) * max_width)
-        bar = "█" * bar_length
+        bar = ENERGY_BAR[: int((energy / 10.0) * len(ENERGY_BAR))]
 
         # Color coding (ASCII safe)
         if energy < 4:
@@ -152,54 +154,61 @@ def generate_ascii_visualization(tracks):
         viz.append(f"    {category:12} | {bpm} BPM | {key_str:5} | {track['genre']}")
         viz.append("")
 
-    viz.append("=" * 80)
+    viz.append(SEPARATOR)
     return "\n".join(viz)
 
 
 def generate_set_structure_analysis(tracks):
     """Анализ структуры сета"""
     analysis = []
-    analysis.append("\n" + "=" * 80)
+    analysis.append("\n" + SEPARATOR)
     analysis.append("🎛️  SET STRUCTURE ANALYSIS")
-    analysis.append("=" * 80)
+    analysis.append(SEPARATOR)
     analysis.append("")
 
     total_duration = sum(t.get("duration_ms", 0) for t in tracks) / 1000 / 60
     analysis.append(f"Total Duration: {total_duration:.1f} minutes")
     analysis.append("")
 
-    # Energy по фазам
+    # Energy по фазам: атрибуты собираются в массивы один раз, статистика
+    # по фазам считается reduceat по границам фаз
     num_tracks = len(tracks)
     phase_size = num_tracks // 5
-
-    phases = [
-        ("WARM-UP", tracks[:phase_size]),
-        ("BUILDING", tracks[phase_size : phase_size * 2]),
-        ("PEAK TIME", tracks[phase_size * 2 : phase_size * 3]),
-        ("CLIMAX", tracks[phase_size * 3 : phase_size * 4]),
-        ("COOL-DOWN", tracks[phase_size * 4 :]),
-    ]
-
-    for phase_name, phase_tracks in phases:
-        if not phase_tracks:
-            continue
-
-        energies = [t.get("energy", 5.0) for t in phase_tracks]
-        bpms = [t.get("bpm") for t in phase_tracks if t.get("bpm")]
-
-        avg_energy = sum(energies) / len(energies) if energies else 0
-        avg_bpm = sum(bpms) / len(bpms) if bpms else 0
+    phase_names = ("WARM-UP", "BUILDING", "PEAK TIME", "CLIMAX", "COOL-DOWN")
+    bounds = np.array([0, phase_size, phase_size * 2, phase_size * 3, phase_size * 4, num_tracks])
+    sizes = np.diff(bounds)
+    nonempty = sizes > 0
+    if not nonempty.any():
+        analysis.append(SEPARATOR)
+        return "\n".join(analysis)
+
+    energies = np.array([t.get("energy", 5.0) for t in tracks], dtype=float)
+    bpms = np.array([t.get("bpm") or np.nan for t in tracks], dtype=float)
+    has_bpm = ~np.isnan(bpms)
+
+    starts = bounds[:-1][nonempty]
+    avg_energy = np.add.reduceat(energies, starts) / sizes[nonempty]
+    bpm_count = np.add.reduceat(has_bpm.astype(int), starts)
+    bpm_sum = np.add.reduceat(np.where(has_bpm, bpms, 0.0), starts)
+    bpm_min = np.fmin.reduceat(bpms, starts)
+    bpm_max = np.fmax.reduceat(bpms, starts)
+
+    phases = zip(np.array(phase_names)[nonempty], sizes[nonempty], strict=True)
+    for i, (phase_name, phase_len) in enumerate(phases):
+        avg_bpm = bpm_sum[i] / bpm_count[i] if bpm_count[i] else 0
 
         analysis.append(f"{phase_name}:")
-        analysis.append(f"  Tracks:      {len(phase_tracks)}")
-        analysis.append(f"  Avg Energy:  {avg_energy:.1f}/10")
+        analysis.append(f"  Tracks:      {phase_len}")
+        analysis.append(f"  Avg Energy:  {avg_energy[i]:.1f}/10")
         analysis.append(f"  Avg BPM:     {avg_bpm:.1f}")
         analysis.append(
-            f"  BPM Range:   {min(bpms):.1f} - {max(bpms):.1f}" if bpms else "  BPM Range:   N/A"
+            f"  BPM Range:   {bpm_min[i]:.1f} - {bpm_max[i]:.1f}"
+            if bpm_count[i]
+            else "  BPM Range:   N/A"
         )
         analysis.append("")
 
-    analysis.append("=" * 80)
+    analysis.append(SEPARATOR)
     return "\n".join(analysis)
 
 
@@ -213,9 +222,8 @@ logger.info("=" * 70)
 
 # Загрузка метаданных
 logger.info(f"\n📋 Загрузка метаданных из {METADATA_FILE}...")
-with open(METADATA_FILE, encoding="utf-8") as f:
-    data = json.load(f)
-    tracks = data["tracks"]
+data = load_json(METADATA_FILE)
+tracks = data["tracks"]
 
 logger.info(f"✓ Загружено {len(tracks)} треков\n")
 
@@ -223,22 +231,28 @@ logger.info(f"✓ Загружено {len(tracks)} треков\n")
 logger.info("🔋 Расчет Energy Level для каждого трека...\n")
 energy_stats = {"calculated": 0, "missing_data": 0}
 
+rated = [t for t in tracks if t.get("bpm") or t.get("loudness_lufs")]
+energies = calculate_energy_levels(
+    [t.get("bpm") for t in rated],
+    [t.get("loudness_lufs") for t in rated],
+    [t.get("genre") for t in rated],
+    [t.get("key") for t in rated],
+)
+categories = categorize_energies(energies)
+for track, energy, category in zip(rated, energies.tolist(), categories, strict=True):
+    track["energy"] = energy
+    track["energy_category"] = category
+
 for track in tracks:
-    bpm = track.get("bpm")
-    loudness = track.get("loudness_lufs")
-    genre = track.get("genre")
-    key = track.get("key")
-
-    if bpm or loudness:
-        energy = calculate_energy_level(bpm, loudness, genre, key)
-        track["energy"] = energy
-        track["energy_category"] = categorize_energy(energy)
+    if track.get("bpm") or track.get("loudness_lufs"):
         energy_stats["calculated"] += 1
 
         logger.info(
-            f"✓ [{track['position']:02d}] {track['artist'][:30]:30} | Energy: {energy:.1f}/10 ({track['energy_category']})"
+            f"✓ [{track['position']:02d}] {track['artist'][:30]:30} | Energy: {track['energy']:.1f}/10 ({track['energy_category']})"
+        )
+        logger.debug(
+            f"    BPM: {track.get('bpm')}, Loudness: {track.get('loudness_lufs')} LUFS, Genre: {track.get('genre')}"
         )
-        logger.debug(f"    BPM: {bpm}, Loudness: {loudness} LUFS, Genre: {genre}")
     else:
         energy_stats["missing_data"] += 1
         logger.warning(
@@ -247,8 +261,7 @@ for track in tracks:
 
 # Сохранение обновленных метаданных
 logger.info("\n💾 Сохранение обновленных метаданных...")
-with open(METADATA_FILE, "w", encoding="utf-8") as f:
-    json.dump(data, f, ensure_ascii=False, indent=2)
+dump_json(METADATA_FILE, data)
 logger.info(f"✓ Сохранено в {METADATA_FILE}")
 
 # Генерация визуализаций
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Camelot Wheel: общие таблицы совместимых переходов для DJ скриптов
+"""
+
+import numpy as np
+
+# Camelot Wheel: совместимые переходы
+CAMELOT_TRANSITIONS = {
+    # Format: camelot_code -> (perfect_match, energy_boost, energy_decrease, mood_change)
+    "1A": ("1A", "2A", "12A", "1B"),
+    "2A": ("2A", "3A", "1A", "2B"),
+    "3A": ("3A", "4A", "2A", "3B"),
+    "4A": ("4A", "5A", "3A", "4B"),
+    "5A": ("5A", "6A", "4A", "5B"),
+    "6A": ("6A", "7A", "5A", "6B"),
+    "7A": ("7A", "8A", "6A", "7B"),
+    "8A": ("8A", "9A", "7A", "8B"),
+    "9A": ("9A", "10A", "8A", "9B"),
+    "10A": ("10A", "11A", "9A", "10B"),
+    "11A": ("11A", "12A", "10A", "11B"),
+    "12A": ("12A", "1A", "11A", "12B"),
+    "1B": ("1B", "2B", "12B", "1A"),
+    "2B": ("2B", "3B", "1B", "2A"),
+    "3B": ("3B", "4B", "2B", "3A"),
+    "4B": ("4B", "5B", "3B", "4A"),
+    "5B": ("5B", "6B", "4B", "5A"),
+    "6B": ("6B", "7B", "5B", "6A"),
+    "7B": ("7B", "8B", "6B", "7A"),
+    "8B": ("8B", "9B", "7B", "8A"),
+    "9B": ("9B", "10B", "8B", "9A"),
+    "10B": ("10B", "11B", "9B", "10A"),
+    "11B": ("11B", "12B", "10B", "11A"),
+    "12B": ("12B", "1B", "11B", "12A"),
+}
+
+# Индексы Camelot кодов: 1A..12A -> 0..11, 1B..12B -> 12..23
+CAMELOT_CODES = tuple(CAMELOT_TRANSITIONS)
+CAMELOT_IDX = {camelot: idx for idx, camelot in enumerate(CAMELOT_CODES)}
+
+# Те же переходы по индексам: CAMELOT_TRANSITIONS_ARR[i] — 4 совместимых ключа для ключа i
+CAMELOT_TRANSITIONS_ARR = np.array(
+    [[CAMELOT_IDX[c] for c in transitions] for transitions in CAMELOT_TRANSITIONS.values()],
+    dtype=np.int8,
+)
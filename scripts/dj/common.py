@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Общие помощники DJ скриптов: чтение и запись JSON, подсчет значений, полоски гистограмм
+"""
+
+import json
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # orjson опционален: fallback на stdlib json
+    orjson = None
+
+# Полоски гистограмм для 0..30 треков: строятся один раз, а не умножением на каждую строку
+COUNT_BARS = tuple("█" * count for count in range(31))
+
+
+def parse_json(data):
+    """Разбор JSON из bytes-like буфера (bytes, memoryview)"""
+    return orjson.loads(data) if orjson else json.loads(bytes(data))
+
+
+def load_json(path):
+    """Чтение JSON файла"""
+    return parse_json(path.read_bytes())
+
+
+def dump_json(path, obj):
+    """Запись JSON файла с отступом 2 (UTF-8, без экранирования не-ASCII)"""
+    if orjson:
+        path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        path.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def count_values(values):
+    """Подсчет значений через np.unique, в порядке первого появления (как у Counter)"""
+    uniq, first, counts = np.unique(
+        np.asarray(values, dtype=str), return_index=True, return_counts=True
+    )
+    order = np.argsort(first)
+    return dict(zip(uniq[order].tolist(), counts[order].tolist(), strict=True))
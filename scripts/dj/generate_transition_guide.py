@@ -4,10 +4,12 @@
 Анализирует каждую пару треков и предлагает технику микширования
 """
 
-import json
 import logging
 from pathlib import Path
 
+import numpy as np
+from common import load_json
+
 # Настройка логирования
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s | %(levelname)-8s | %(message)s", datefmt="%H:%M:%S"
@@ -28,36 +30,62 @@ CAMELOT_QUALITY = {
 }
 
 
-def get_camelot_relationship(from_key, to_key):
-    """Определение типа Camelot перехода"""
-    if not from_key or not to_key:
-        return "unknown", "Неизвестно"
+# Типы Camelot переходов: (качество, описание); индекс = код в _RELATION
+_RELATIONSHIPS = (
+    ("perfect", "Идеальный матч (тот же ключ)"),
+    ("excellent", "Energy boost (+1 на Camelot Wheel)"),
+    ("excellent", "Energy decrease (-1 на Camelot Wheel)"),
+    ("good", "Major/Minor switch (смена настроения)"),
+    ("moderate", "Драматический переход (±2)"),
+    ("challenging", "Сложный переход - требует осторожности"),
+)
 
-    # Извлекаем номер и букву
-    from_num = int("".join(filter(str.isdigit, from_key)))
-    to_num = int("".join(filter(str.isdigit, to_key)))
-    from_letter = from_key[-1]
-    to_letter = to_key[-1]
+# Слот Camelot кода: 0..11 = 1A..12A, 12..23 = 1B..12B
+_SLOT = {
+    f"{n}{letter}": (n - 1) + (0 if letter == "A" else 12) for n in range(1, 13) for letter in "AB"
+}
+
+
+def _classify_camelot(from_key, to_key):
+    """Код типа перехода (индекс в _RELATIONSHIPS) для двух Camelot кодов"""
+    # Извлекаем номер и букву (формат Camelot: 1A..12B)
+    from_num, from_letter = int(from_key[:-1]), from_key[-1]
+    to_num, to_letter = int(to_key[:-1]), to_key[-1]
 
     if from_key == to_key:
-        return "perfect", "Идеальный матч (тот же ключ)"
+        return 0
 
     if from_letter == to_letter:
         # Та же буква (major/minor)
         diff = (to_num - from_num) % 12
-        if diff == 1 or diff == 11:
-            if diff == 1:
-                return "excellent", "Energy boost (+1 на Camelot Wheel)"
-            else:
-                return "excellent", "Energy decrease (-1 на Camelot Wheel)"
-        elif diff == 2 or diff == 10:
-            return "moderate", "Драматический переход (±2)"
-    else:
+        if diff == 1:
+            return 1
+        if diff == 11:
+            return 2
+        if diff == 2 or diff == 10:
+            return 4
+    elif from_num == to_num:
         # Переход A ↔ B
-        if from_num == to_num:
-            return "good", "Major/Minor switch (смена настроения)"
+        return 3
+
+    return 5
 
-    return "challenging", "Сложный переход - требует осторожности"
+
+# Таблица 24×24 всех переходов, считается один раз при импорте
+_RELATION = np.zeros((24, 24), dtype=np.uint8)
+for _from, _i in _SLOT.items():
+    for _to, _j in _SLOT.items():
+        _RELATION[_i, _j] = _classify_camelot(_from, _to)
+
+
+def get_camelot_relationship(from_key, to_key):
+    """Определение типа Camelot перехода"""
+    from_slot = _SLOT.get(from_key)
+    to_slot = _SLOT.get(to_key)
+    if from_slot is None or to_slot is None:
+        return "unknown", "Неизвестно"
+
+    return _RELATIONSHIPS[_RELATION[from_slot, to_slot]]
 
 
 def recommend_transition_technique(track_a, track_b):
@@ -132,89 +160,88 @@ def recommend_transition_technique(track_a, track_b):
     return "\n".join(technique)
 
 
+SEPARATOR = "=" * 100
+TRANSITION_SEPARATOR = "─" * 100
+
+
 def generate_transition_guide(tracks):
-    """Генерация полного гайда по переходам"""
-    guide = []
-    guide.append("=" * 100)
-    guide.append("🎛️  DETAILED TRANSITION GUIDE")
-    guide.append("=" * 100)
-    guide.append("")
-    guide.append(
-        "Этот гайд содержит детальные рекомендации по переходам между каждой парой треков."
-    )
-    guide.append("Используйте его для планирования и практики вашего DJ сета.")
-    guide.append("")
-    guide.append("=" * 100)
-    guide.append("")
+    """Генерация полного гайда по переходам (построчно, без сборки в память)"""
+    yield SEPARATOR
+    yield "🎛️  DETAILED TRANSITION GUIDE"
+    yield SEPARATOR
+    yield ""
+    yield "Этот гайд содержит детальные рекомендации по переходам между каждой парой треков."
+    yield "Используйте его для планирования и практики вашего DJ сета."
+    yield ""
+    yield SEPARATOR
+    yield ""
 
     for i in range(len(tracks) - 1):
         track_a = tracks[i]
         track_b = tracks[i + 1]
 
-        guide.append(f"\n{'─' * 100}")
-        guide.append(
+        yield "\n" + TRANSITION_SEPARATOR
+        yield (
             f"ПЕРЕХОД #{i + 1}: Track {track_a['position']:02d} → Track {track_b['position']:02d}"
         )
-        guide.append(f"{'─' * 100}")
-        guide.append("")
+        yield TRANSITION_SEPARATOR
+        yield ""
 
         # Track A info
-        guide.append("🎵 TRACK A (OUTGOING):")
-        guide.append(f"   {track_a['artist']} - {track_a['title']}")
-        guide.append(
+        yield "🎵 TRACK A (OUTGOING):"
+        yield f"   {track_a['artist']} - {track_a['title']}"
+        yield (
             f"   BPM: {track_a.get('bpm', 'N/A')} | Key: {track_a.get('key', 'N/A')} ({track_a.get('camelot', 'N/A')})"
         )
-        guide.append(
+        yield (
             f"   Energy: {track_a.get('energy', 'N/A')}/10 ({track_a.get('energy_category', 'N/A')})"
         )
-        guide.append(f"   Genre: {track_a.get('genre', 'N/A')}")
-        guide.append("")
+        yield f"   Genre: {track_a.get('genre', 'N/A')}"
+        yield ""
 
         # Track B info
-        guide.append("🎵 TRACK B (INCOMING):")
-        guide.append(f"   {track_b['artist']} - {track_b['title']}")
-        guide.append(
+        yield "🎵 TRACK B (INCOMING):"
+        yield f"   {track_b['artist']} - {track_b['title']}"
+        yield (
             f"   BPM: {track_b.get('bpm', 'N/A')} | Key: {track_b.get('key', 'N/A')} ({track_b.get('camelot', 'N/A')})"
         )
-        guide.append(
+        yield (
             f"   Energy: {track_b.get('energy', 'N/A')}/10 ({track_b.get('energy_category', 'N/A')})"
         )
-        guide.append(f"   Genre: {track_b.get('genre', 'N/A')}")
-        guide.append("")
+        yield f"   Genre: {track_b.get('genre', 'N/A')}"
+        yield ""
 
         # Transition technique
-        guide.append("🎚️  РЕКОМЕНДАЦИИ ПО МИКШИРОВАНИЮ:")
-        guide.append("")
+        yield "🎚️  РЕКОМЕНДАЦИИ ПО МИКШИРОВАНИЮ:"
+        yield ""
         technique = recommend_transition_technique(track_a, track_b)
-        guide.append(technique)
-        guide.append("")
-
-    guide.append("\n" + "=" * 100)
-    guide.append("📝 LEGEND")
-    guide.append("=" * 100)
-    guide.append("")
-    guide.append("**BPM Match Quality:**")
-    guide.append("  ⚡ Perfect (0 BPM diff) - длинный плавный переход")
-    guide.append("  ⚡ Good (1-2 BPM diff) - стандартный переход")
-    guide.append("  ⚠️  Moderate (3-4 BPM diff) - требует внимания")
-    guide.append("  🔴 Challenging (5+ BPM diff) - сложный переход")
-    guide.append("")
-    guide.append("**Key Match Quality:**")
-    guide.append("  🎹 Perfect - тот же ключ")
-    guide.append("  🎹 Excellent - ±1 на Camelot Wheel")
-    guide.append("  🎹 Good - Major/Minor switch")
-    guide.append("  ⚠️  Moderate - ±2 или другие комбинации")
-    guide.append("  🔴 Challenging - требует осторожности")
-    guide.append("")
-    guide.append("**Mixing Techniques:**")
-    guide.append("  • Bass Swap - обмен басами между треками")
-    guide.append("  • EQ Mixing - постепенная замена частот")
-    guide.append("  • Echo Out - fade out с эхо/reverb")
-    guide.append("  • Hard Cut - резкий переход (на downbeat)")
-    guide.append("")
-    guide.append("=" * 100)
-
-    return "\n".join(guide)
+        yield technique
+        yield ""
+
+    yield "\n" + SEPARATOR
+    yield "📝 LEGEND"
+    yield SEPARATOR
+    yield ""
+    yield "**BPM Match Quality:**"
+    yield "  ⚡ Perfect (0 BPM diff) - длинный плавный переход"
+    yield "  ⚡ Good (1-2 BPM diff) - стандартный переход"
+    yield "  ⚠️  Moderate (3-4 BPM diff) - требует внимания"
+    yield "  🔴 Challenging (5+ BPM diff) - сложный переход"
+    yield ""
+    yield "**Key Match Quality:**"
+    yield "  🎹 Perfect - тот же ключ"
+    yield "  🎹 Excellent - ±1 на Camelot Wheel"
+    yield "  🎹 Good - Major/Minor switch"
+    yield "  ⚠️  Moderate - ±2 или другие комбинации"
+    yield "  🔴 Challenging - требует осторожности"
+    yield ""
+    yield "**Mixing Techniques:**"
+    yield "  • Bass Swap - обмен басами между треками"
+    yield "  • EQ Mixing - постепенная замена частот"
+    yield "  • Echo Out - fade out с эхо/reverb"
+    yield "  • Hard Cut - резкий переход (на downbeat)"
+    yield ""
+    yield SEPARATOR
 
 
 # ============================================================================
@@ -227,23 +254,23 @@ logger.info("=" * 70)
 
 # Загрузка метаданных
 logger.info(f"\n📋 Загрузка метаданных из {METADATA_FILE}...")
-with open(METADATA_FILE, encoding="utf-8") as f:
-    data = json.load(f)
-    tracks = data["tracks"]
+data = load_json(METADATA_FILE)
+tracks = data["tracks"]
 
 logger.info(f"✓ Загружено {len(tracks)} треков\n")
 
 # Генерация гайда
 logger.info("📝 Генерация transition guide...")
-guide_content = generate_transition_guide(tracks)
-
-# Сохранение
 guide_file = DJ_SET_DIR / "transition_guide.txt"
 with open(guide_file, "w", encoding="utf-8") as f:
-    f.write(guide_content)
+    # Строки через "\n" без перевода строки в конце — как "\n".join(...)
+    guide_size, sep = 0, ""
+    for line in generate_transition_guide(tracks):
+        guide_size += f.write(sep + line)
+        sep = "\n"
 
 logger.info(f"✓ Transition guide сохранен: {guide_file}")
-logger.info(f"   Размер: {len(guide_content)} символов")
+logger.info(f"   Размер: {guide_size} символов")
 logger.info(f"   Переходов: {len(tracks) - 1}")
 
 # Preview первого перехода
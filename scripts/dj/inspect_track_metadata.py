@@ -8,6 +8,22 @@ from yandex_music import Client
 TOKEN = sys.argv[1] if len(sys.argv) > 1 else None
 PLAYLIST_ID = "250905515/1113"
 
+
+def print_attributes(obj):
+    """Печать хранимых атрибутов объекта
+
+    vars() не вызывает properties (часть из них ходит в сеть), в отличие от dir() + getattr
+    """
+    try:
+        attrs = vars(obj)
+    except TypeError:  # объект с __slots__
+        attrs = {name: getattr(obj, name) for name in getattr(type(obj), "__slots__", ())}
+
+    for attr, value in sorted(attrs.items()):
+        if not attr.startswith("_") and not callable(value):
+            print(f"  {attr:30} = {repr(value)[:100]}")
+
+
 if not TOKEN:
     print("Usage: python inspect_track_metadata.py <TOKEN>")
     sys.exit(1)
@@ -27,48 +43,30 @@ print("=" * 80)
 
 # Все доступные атрибуты трека
 print("\n📋 АТРИБУТЫ ОБЪЕКТА TRACK:")
-for attr in sorted(dir(track)):
-    if not attr.startswith("_"):
-        try:
-            value = getattr(track, attr)
-            if not callable(value):
-                print(f"  {attr:30} = {repr(value)[:100]}")
-        except Exception:
-            pass
+print_attributes(track)
 
 # Проверяем albums
 if track.albums:
     album = track.albums[0]
     print("\n📀 АТРИБУТЫ АЛЬБОМА:")
-    for attr in sorted(dir(album)):
-        if not attr.startswith("_"):
-            try:
-                value = getattr(album, attr)
-                if not callable(value):
-                    print(f"  {attr:30} = {repr(value)[:100]}")
-            except Exception:
-                pass
+    print_attributes(album)
 
 # Проверяем artists
 if track.artists:
     artist = track.artists[0]
     print("\n🎤 АТРИБУТЫ ИСПОЛНИТЕЛЯ:")
-    for attr in sorted(dir(artist)):
-        if not attr.startswith("_"):
-            try:
-                value = getattr(artist, attr)
-                if not callable(value):
-                    print(f"  {attr:30} = {repr(value)[:100]}")
-            except Exception:
-                pass
+    print_attributes(artist)
 
 # Получаем полную информацию о треке
 print("\n🔍 ДОПОЛНИТЕЛЬНЫЕ МЕТОДЫ API:")
 try:
-    # Попытка получить дополнительные данные
-    track_full = client.tracks([track.id])[0]
-    print(f"  Supplement available: {hasattr(track_full, 'supplement')}")
-    if hasattr(track_full, "supplement") and track_full.supplement:
+    # Полные данные всех треков плейлиста одним запросом
+    tracks_full = client.tracks([ts.track_id for ts in playlist.tracks])
+    print(f"  Треков получено одним запросом: {len(tracks_full)}")
+    with_supplement = sum(1 for t in tracks_full if getattr(t, "supplement", None))
+    print(f"  Supplement available: {with_supplement}/{len(tracks_full)}")
+    track_full = tracks_full[0]
+    if getattr(track_full, "supplement", None):
         print(f"  Supplement: {track_full.supplement}")
 except Exception as e:
     print(f"  Error: {e}")
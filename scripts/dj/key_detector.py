@@ -1,17 +1,36 @@
 #!/usr/bin/env python3
 """
-Key Detection используя librosa chroma features
+Key Detection по chroma профилю (FFT энергия, свернутая в 12 pitch-классов)
 Алгоритм Krumhansl-Schmuckler для определения тональности
 """
 
+from functools import lru_cache
+
 import librosa
 import numpy as np
 
+# Версия алгоритма: увеличивать при изменении профилей, KEY_SR, параметров chroma и т.п.,
+# чтобы analyze_audio.py не брал устаревшие результаты из .analysis_cache/
+KEY_DETECTOR_VERSION = 1
+
 # Krumhansl-Schmuckler key profiles
 # Профили для major и minor тональностей (корреляционные веса)
 MAJOR_PROFILE = np.array([6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88])
 MINOR_PROFILE = np.array([6.33, 2.68, 3.52, 5.38, 2.60, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17])
 
+# Частота дискретизации и размер окна/шага STFT для chroma
+KEY_SR = 11025
+CHROMA_N_FFT = 4096
+
+# Диапазон частот для chroma: C2..C7 (ниже бины FFT грубее полутона, выше — обертоны и шум)
+CHROMA_FMIN = 65.41
+CHROMA_FMAX = 2093.0
+
+# Сколько кадров FFT обрабатывается за раз (ограничивает память при стриминге)
+CHROMA_BLOCK_FRAMES = 64
+
+_WINDOW = np.hanning(CHROMA_N_FFT)
+
 # Mapping chroma index to note names
 CHROMA_NOTES = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
 
@@ -43,6 +62,56 @@ CAMELOT_WHEEL = {
     "Bm": "10A",
 }
 
+# 24 повернутых профиля (12 major + 12 minor), z-нормализованные один раз при импорте,
+# и соответствующие им ключи
+_PROFILES = np.array(
+    [np.roll(MAJOR_PROFILE, i) for i in range(12)] + [np.roll(MINOR_PROFILE, i) for i in range(12)]
+)
+_PROFILES_Z = (_PROFILES - _PROFILES.mean(axis=1, keepdims=True)) / _PROFILES.std(
+    axis=1, keepdims=True
+)
+_KEYS = tuple(CHROMA_NOTES) + tuple(f"{note}m" for note in CHROMA_NOTES)
+
+
+def _ks_scores(chroma_mean):
+    """Корреляции Пирсона chroma профиля со всеми 24 ключами (порядок как в _KEYS)
+
+    Для z-нормализованных векторов корреляция Пирсона = скалярное произведение / 12,
+    поэтому все 24 значения считаются одним умножением матрицы на вектор.
+    """
+    chroma_z = (chroma_mean - chroma_mean.mean()) / chroma_mean.std()
+    return _PROFILES_Z @ chroma_z / 12
+
+
+@lru_cache
+def _pitch_class_bins(sr):
+    """Индексы FFT бинов в диапазоне CHROMA_FMIN..CHROMA_FMAX и их pitch-классы (0 = C)"""
+    freqs = np.fft.rfftfreq(CHROMA_N_FFT, d=1 / sr)
+    bins = np.flatnonzero((freqs >= CHROMA_FMIN) & (freqs <= CHROMA_FMAX))
+    midi = np.round(12 * np.log2(freqs[bins] / 440) + 69).astype(np.int64)
+    return bins, midi % 12
+
+
+def _chroma_profile(y, sr):
+    """Суммарная энергия 12 pitch-классов по всему сигналу
+
+    Спектр считается блоками по CHROMA_BLOCK_FRAMES непересекающихся кадров и сразу
+    сворачивается в накопитель, поэтому полная спектрограмма в памяти не хранится.
+    """
+    if len(y) < CHROMA_N_FFT:
+        y = np.pad(y, (0, CHROMA_N_FFT - len(y)))
+
+    bins, pitch_classes = _pitch_class_bins(sr)
+    n_frames = len(y) // CHROMA_N_FFT
+    frames = y[: n_frames * CHROMA_N_FFT].reshape(n_frames, CHROMA_N_FFT)
+
+    power = np.zeros(len(bins))
+    for start in range(0, n_frames, CHROMA_BLOCK_FRAMES):
+        spectrum = np.fft.rfft(frames[start : start + CHROMA_BLOCK_FRAMES] * _WINDOW, axis=1)
+        power += (np.abs(spectrum[:, bins]) ** 2).sum(axis=0)
+
+    return np.bincount(pitch_classes, weights=power, minlength=12)
+
 
 def detect_key(audio_path, duration=180):
     """
@@ -60,63 +129,43 @@ def detect_key(audio_path, duration=180):
     """
     try:
         # Загрузка аудио
-        y, sr = librosa.load(audio_path, duration=duration)
-
-        # Извлечение chroma features (12-мерный вектор энергии питчей)
-        chroma = librosa.feature.chroma_cqt(y=y, sr=sr)
-
-        # Усреднение по времени для получения общего профиля
-        chroma_mean = np.mean(chroma, axis=1)
-
-        # Нормализация
-        chroma_mean = chroma_mean / np.sum(chroma_mean)
+        y, sr = librosa.load(audio_path, sr=KEY_SR, duration=duration, mono=True)
+        return detect_key_from_audio(y, sr)
 
-        # Корреляция с каждым ключом (24 варианта: 12 major + 12 minor)
-        correlations = []
-
-        for i in range(12):  # 12 тональностей
-            # Rotate profile для каждого ключа
-            rotated_major = np.roll(MAJOR_PROFILE, i)
-            rotated_minor = np.roll(MINOR_PROFILE, i)
-
-            # Нормализация профилей
-            rotated_major = rotated_major / np.sum(rotated_major)
-            rotated_minor = rotated_minor / np.sum(rotated_minor)
+    except Exception as e:
+        print(f"Error detecting key: {e}")
+        return None, None, None
 
-            # Корреляция Пирсона
-            corr_major = np.corrcoef(chroma_mean, rotated_major)[0, 1]
-            corr_minor = np.corrcoef(chroma_mean, rotated_minor)[0, 1]
 
-            correlations.append(
-                {"note": CHROMA_NOTES[i], "scale": "major", "correlation": corr_major}
-            )
-            correlations.append(
-                {"note": CHROMA_NOTES[i], "scale": "minor", "correlation": corr_minor}
-            )
+def detect_key_from_audio(y, sr):
+    """
+    Определение тональности по уже загруженному mono сигналу
 
-        # Сортировка по корреляции
-        correlations.sort(key=lambda x: x["correlation"], reverse=True)
+    Args:
+        y: аудиосигнал (mono)
+        sr: частота дискретизации
 
-        # Лучший результат
-        best = correlations[0]
-        note = best["note"]
-        scale = best["scale"]
-        confidence = best["correlation"]
+    Returns:
+        tuple: (key, camelot, confidence), как в detect_key
+    """
+    # Chroma профиль (12-мерный вектор энергии питчей) по всему сигналу.
+    # Для тональности нужна только суммарная энергия pitch-классов, поэтому
+    # вместо chroma_stft/CQT спектр сразу сворачивается в 12 корзин
+    chroma_mean = _chroma_profile(y, sr)
 
-        # Форматирование ключа
-        if scale == "minor":
-            key = f"{note}m"
-        else:
-            key = note
+    # Корреляция с каждым ключом (24 варианта: 12 major + 12 minor): z-нормализованный
+    # chroma умножается на заранее z-нормализованные профили _PROFILES_Z
+    correlations = _ks_scores(chroma_mean)
 
-        # Camelot код
-        camelot = CAMELOT_WHEEL.get(key, "Unknown")
+    # Лучший результат
+    best = int(correlations.argmax())
+    key = _KEYS[best]
+    confidence = float(correlations[best])
 
-        return key, camelot, round(confidence, 2)
+    # Camelot код
+    camelot = CAMELOT_WHEEL.get(key, "Unknown")
 
-    except Exception as e:
-        print(f"Error detecting key: {e}")
-        return None, None, None
+    return key, camelot, round(confidence, 2)
 
 
 def detect_key_simple(audio_path):
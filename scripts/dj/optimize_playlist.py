@@ -4,12 +4,15 @@
 Удаляет проблемные треки и создает оптимизированный плейлист
 """
 
-import json
 import logging
+import mmap
 import shutil
 from datetime import datetime
 from pathlib import Path
 
+import numpy as np
+from common import dump_json, parse_json
+
 # Настройка логирования
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s | %(levelname)-8s | %(message)s", datefmt="%H:%M:%S"
@@ -60,6 +63,24 @@ def validate_track(track):
     return {"score": score, "issues": issues, "pass": len(issues) == 0 and score >= 60}
 
 
+def passing_mask(tracks):
+    """Векторизованная проверка: какие треки проходят validate_track без замечаний"""
+    count = len(tracks)
+    bpm = np.fromiter((t.get("bpm") or np.nan for t in tracks), dtype=float, count=count)
+    confidence = np.fromiter(
+        (t.get("key_confidence") or 0 for t in tracks), dtype=float, count=count
+    )
+    has_key = np.fromiter((bool(t.get("key")) for t in tracks), dtype=bool, count=count)
+
+    # NaN (отсутствующий BPM) не проходит ни одно сравнение
+    return (
+        (bpm >= VALIDATION_CRITERIA["bpm_min"])
+        & (bpm <= VALIDATION_CRITERIA["bpm_max"])
+        & has_key
+        & (confidence >= VALIDATION_CRITERIA["key_confidence_min"])
+    )
+
+
 # ============================================================================
 # ОПТИМИЗАЦИЯ
 # ============================================================================
@@ -76,13 +97,15 @@ def create_optimized_playlist(tracks, mode="auto", min_score=60):
     accepted = []
     rejected = []
 
-    for track in tracks:
-        validation = validate_track(track)
+    # Трек без замечаний имеет score 100, поэтому полная валидация с описанием
+    # проблем нужна только для отклоненных
+    passed = passing_mask(tracks) & (min_score <= 100)
 
-        if validation["pass"] and validation["score"] >= min_score:
+    for track, ok in zip(tracks, passed.tolist(), strict=True):
+        if ok:
             accepted.append(track)
         else:
-            rejected.append({"track": track, "validation": validation})
+            rejected.append({"track": track, "validation": validate_track(track)})
 
     return accepted, rejected
 
@@ -98,22 +121,30 @@ def create_backup(metadata_file):
     return backup_file
 
 
+def load_metadata(path):
+    """Чтение JSON метаданных через mmap (без промежуточной копии файла в памяти)"""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # memoryview должен быть освобожден до закрытия mmap
+        with memoryview(mm) as view:
+            return parse_json(view)
+
+
 def update_playlist_files(accepted_tracks, output_dir):
     """Обновление M3U8 файлов с новым плейлистом"""
     m3u8_file = output_dir / "techno_2025_optimized.m3u8"
 
-    lines = ["#EXTM3U\n"]
+    lines = ["#EXTM3U"]
     for track in accepted_tracks:
         artist = track.get("artist", "Unknown")
         title = track.get("title", "Unknown")
         duration = track.get("duration", 0)
         filename = track.get("filename", "")
 
-        lines.append(f"#EXTINF:{duration},{artist} - {title}\n")
-        lines.append(f"{filename}\n")
+        lines.append(f"#EXTINF:{duration},{artist} - {title}")
+        lines.append(filename)
 
-    with open(m3u8_file, "w", encoding="utf-8") as f:
-        f.writelines(lines)
+    # Один вызов write вместо записи построчно
+    m3u8_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
 
     logger.info(f"✓ Создан оптимизированный M3U8: {m3u8_file.name}")
     return m3u8_file
@@ -130,9 +161,8 @@ if __name__ == "__main__":
 
     # Загрузка метаданных
     logger.info(f"\n📋 Загрузка метаданных из {METADATA_FILE}...")
-    with open(METADATA_FILE, encoding="utf-8") as f:
-        data = json.load(f)
-        original_tracks = data["tracks"]
+    data = load_metadata(METADATA_FILE)
+    original_tracks = data["tracks"]
 
     logger.info(f"✓ Загружено {len(original_tracks)} треков\n")
 
@@ -180,8 +210,7 @@ if __name__ == "__main__":
             },
         }
 
-        with open(optimized_metadata, "w", encoding="utf-8") as f:
-            json.dump(optimized_data, f, ensure_ascii=False, indent=2)
+        dump_json(optimized_metadata, optimized_data)
 
         logger.info(f"✓ Метаданные: {optimized_metadata.name}")
 
@@ -190,8 +219,7 @@ if __name__ == "__main__":
 
         # Сохранение списка отклоненных
         rejected_file = DJ_SET_DIR / "rejected_tracks.json"
-        with open(rejected_file, "w", encoding="utf-8") as f:
-            json.dump([r["track"] for r in rejected], f, ensure_ascii=False, indent=2)
+        dump_json(rejected_file, [r["track"] for r in rejected])
 
         logger.info(f"✓ Список отклоненных: {rejected_file.name}")
 
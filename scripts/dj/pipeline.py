@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Валидация плейлиста и запись тегов за один запуск
+Метаданные читаются один раз и передаются в validate_playlist и write_id3_tags
+"""
+
+import logging
+import sys
+from pathlib import Path
+
+import validate_playlist
+import write_id3_tags
+from common import load_json
+
+# Настройка логирования
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s | %(levelname)-8s | %(message)s", datefmt="%H:%M:%S"
+)
+logger = logging.getLogger(__name__)
+
+PROJECT_DIR = Path(__file__).parent
+DJ_SET_DIR = PROJECT_DIR / "dj_set_techno_2025"
+METADATA_FILE = DJ_SET_DIR / "tracklist_metadata.json"
+
+
+if __name__ == "__main__":
+    if not write_id3_tags.HAS_MUTAGEN:
+        sys.exit(1)
+
+    logger.info("=" * 70)
+    logger.info("🎛️  ВАЛИДАЦИЯ ПЛЕЙЛИСТА И ЗАПИСЬ МЕТАДАННЫХ")
+    logger.info("=" * 70)
+
+    # Загрузка метаданных (один раз для обоих этапов)
+    logger.info(f"\n📋 Загрузка метаданных из {METADATA_FILE}...")
+    data = load_json(METADATA_FILE)
+    tracks = data["tracks"]
+
+    logger.info(f"✓ Загружено {len(tracks)} треков\n")
+
+    # 1. Валидация и фильтрация
+    validate_playlist.run(tracks)
+
+    # 2. Запись тегов в аудиофайлы
+    logger.info("\n" + "=" * 70)
+    logger.info("💾 ЗАПИСЬ МЕТАДАННЫХ В АУДИОФАЙЛЫ")
+    logger.info("=" * 70)
+    write_id3_tags.run(tracks)
@@ -5,11 +5,11 @@
 """
 
 import csv
-import json
 import logging
 import sys
 from pathlib import Path
 
+from common import count_values, dump_json
 from yandex_music import Client
 
 # Настройка логирования
@@ -19,6 +19,7 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
 # Параметры
 args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
 TOKEN = args[0] if args else None
@@ -105,53 +106,49 @@ logger.info("\n📊 Экспорт метаданных...")
 
 # 1. JSON для программной обработки
 json_file = DJ_SET_DIR / "tracklist_metadata.json"
-with open(json_file, "w", encoding="utf-8") as f:
-    json.dump(
-        {
-            "playlist_title": playlist.title,
-            "playlist_id": PLAYLIST_ID,
-            "total_tracks": len(tracks_metadata),
-            "tracks": tracks_metadata,
-        },
-        f,
-        ensure_ascii=False,
-        indent=2,
-    )
+json_data = {
+    "playlist_title": playlist.title,
+    "playlist_id": PLAYLIST_ID,
+    "total_tracks": len(tracks_metadata),
+    "tracks": tracks_metadata,
+}
+dump_json(json_file, json_data)
 logger.info(f"✓ JSON: {json_file}")
 
 # 2. CSV для Excel/DJ софта
 csv_file = DJ_SET_DIR / "tracklist.csv"
 with open(csv_file, "w", encoding="utf-8", newline="") as f:
-    writer = csv.DictWriter(f, fieldnames=tracks_metadata[0].keys())
-    writer.writeheader()
-    writer.writerows(tracks_metadata)
+    # Все треки имеют одинаковый набор полей — строки собираются без поиска по fieldnames
+    writer = csv.writer(f)
+    writer.writerow(tracks_metadata[0].keys())
+    writer.writerows(track.values() for track in tracks_metadata)
 logger.info(f"✓ CSV: {csv_file}")
 
 # 3. M3U8 плейлист для DJ Pro AI
 m3u_file = DJ_SET_DIR / "techno_2025.m3u8"
-with open(m3u_file, "w", encoding="utf-8") as f:
-    f.write("#EXTM3U\n")
-    for track in tracks_metadata:
-        # Расширенные теги M3U
-        f.write(
-            f"#EXTINF:{int(track['duration_ms'] / 1000)},{track['artist']} - {track['title']}\n"
-        )
-        f.write(f"#EXTGENRE:{track['genre']}\n")
-        if track["bpm"]:
-            f.write(f"#EXTBPM:{track['bpm']}\n")
-        if track["key"]:
-            f.write(f"#EXTKEY:{track['key']}\n")
-        f.write(f"{track['filename']}\n")
+m3u_lines = ["#EXTM3U"]
+for track in tracks_metadata:
+    # Расширенные теги M3U
+    m3u_lines.append(
+        f"#EXTINF:{int(track['duration_ms'] / 1000)},{track['artist']} - {track['title']}"
+    )
+    m3u_lines.append(f"#EXTGENRE:{track['genre']}")
+    if track["bpm"]:
+        m3u_lines.append(f"#EXTBPM:{track['bpm']}")
+    if track["key"]:
+        m3u_lines.append(f"#EXTKEY:{track['key']}")
+    m3u_lines.append(track["filename"])
+m3u_file.write_text("\n".join(m3u_lines) + "\n", encoding="utf-8")
 logger.info(f"✓ M3U8: {m3u_file}")
 
 # 4. Текстовый tracklist для постов
 txt_file = DJ_SET_DIR / "tracklist.txt"
-with open(txt_file, "w", encoding="utf-8") as f:
-    f.write(f"🎧 {playlist.title}\n")
-    f.write(f"{'=' * 60}\n\n")
-    for track in tracks_metadata:
-        f.write(f"{track['position']:02d}. {track['artist']} - {track['title']}\n")
-        f.write(f"    [{track['label']}] {track['genre']}\n\n")
+txt_lines = [f"🎧 {playlist.title}", "=" * 60, ""]
+for track in tracks_metadata:
+    txt_lines.append(f"{track['position']:02d}. {track['artist']} - {track['title']}")
+    txt_lines.append(f"    [{track['label']}] {track['genre']}")
+    txt_lines.append("")
+txt_file.write_text("\n".join(txt_lines) + "\n", encoding="utf-8")
 logger.info(f"✓ TXT: {txt_file}")
 
 # Статистика
@@ -161,19 +158,13 @@ logger.info("=" * 60)
 logger.info(f"Всего треков:     {len(tracks_metadata)}")
 
 # Подсчет жанров
-genres = {}
-for track in tracks_metadata:
-    g = track["genre"]
-    genres[g] = genres.get(g, 0) + 1
+genres = count_values([track["genre"] for track in tracks_metadata])
 logger.info("\nЖанры:")
 for genre, count in sorted(genres.items(), key=lambda x: x[1], reverse=True):
     logger.info(f"  {genre:20} {count:3d} треков")
 
 # Подсчет лейблов
-labels = {}
-for track in tracks_metadata:
-    label_name = track["label"]
-    labels[label_name] = labels.get(label_name, 0) + 1
+labels = count_values([track["label"] for track in tracks_metadata])
 logger.info("\nТоп-5 лейблов:")
 for label, count in sorted(labels.items(), key=lambda x: x[1], reverse=True)[:5]:
     logger.info(f"  {label:30} {count:3d} треков")
@@ -4,11 +4,13 @@
 Находит треки которые заполнят пробелы в Camelot Wheel и BPM диапазоне
 """
 
-import json
 import logging
-from collections import Counter
 from pathlib import Path
 
+import numpy as np
+from camelot import CAMELOT_TRANSITIONS
+from common import COUNT_BARS, count_values, dump_json, load_json
+
 # Настройка логирования
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s | %(levelname)-8s | %(message)s", datefmt="%H:%M:%S"
@@ -47,32 +49,9 @@ CAMELOT_TO_KEY = {
     "12B": "F",
 }
 
-CAMELOT_TRANSITIONS = {
-    "1A": ["1A", "2A", "12A", "1B"],
-    "2A": ["2A", "3A", "1A", "2B"],
-    "3A": ["3A", "4A", "2A", "3B"],
-    "4A": ["4A", "5A", "3A", "4B"],
-    "5A": ["5A", "6A", "4A", "5B"],
-    "6A": ["6A", "7A", "5A", "6B"],
-    "7A": ["7A", "8A", "6A", "7B"],
-    "8A": ["8A", "9A", "7A", "8B"],
-    "9A": ["9A", "10A", "8A", "9B"],
-    "10A": ["10A", "11A", "9A", "10B"],
-    "11A": ["11A", "12A", "10A", "11B"],
-    "12A": ["12A", "1A", "11A", "12B"],
-    "1B": ["1B", "2B", "12B", "1A"],
-    "2B": ["2B", "3B", "1B", "2A"],
-    "3B": ["3B", "4B", "2B", "3A"],
-    "4B": ["4B", "5B", "3B", "4A"],
-    "5B": ["5B", "6B", "4B", "5A"],
-    "6B": ["6B", "7B", "5B", "6A"],
-    "7B": ["7B", "8B", "6B", "7A"],
-    "8B": ["8B", "9B", "7B", "8A"],
-    "9B": ["9B", "10B", "8B", "9A"],
-    "10B": ["10B", "11B", "9B", "10A"],
-    "11B": ["11B", "12B", "10B", "11A"],
-    "12B": ["12B", "1B", "11B", "12A"],
-}
+# Границы BPM диапазонов для гистограммы (шаг 5 BPM)
+BPM_BIN_EDGES = np.arange(115, 145, 5)
+BPM_BIN_LABELS = [f"{lo}-{lo + 5}" for lo in BPM_BIN_EDGES[:-1]]
 
 
 # ============================================================================
@@ -83,24 +62,20 @@ CAMELOT_TRANSITIONS = {
 def analyze_playlist_gaps(tracks):
     """Анализ пробелов в плейлисте"""
     # BPM распределение
-    bpm_values = [t["bpm"] for t in tracks if t.get("bpm")]
-    bpm_min = min(bpm_values) if bpm_values else 120
-    bpm_max = max(bpm_values) if bpm_values else 135
+    bpms = np.fromiter((t["bpm"] for t in tracks if t.get("bpm")), dtype=np.float64)
+    bpm_min = float(bpms.min()) if bpms.size else 120
+    bpm_max = float(bpms.max()) if bpms.size else 135
 
     # Key распределение
-    key_distribution = Counter(t.get("camelot") for t in tracks if t.get("camelot"))
+    key_distribution = count_values([t["camelot"] for t in tracks if t.get("camelot")])
     present_keys = set(key_distribution.keys())
     all_keys = set(CAMELOT_TRANSITIONS.keys())
     missing_keys = all_keys - present_keys
 
     # BPM gaps (диапазоны где мало треков)
-    bpm_ranges = {
-        "115-120": sum(1 for bpm in bpm_values if 115 <= bpm < 120),
-        "120-125": sum(1 for bpm in bpm_values if 120 <= bpm < 125),
-        "125-130": sum(1 for bpm in bpm_values if 125 <= bpm < 130),
-        "130-135": sum(1 for bpm in bpm_values if 130 <= bpm < 135),
-        "135-140": sum(1 for bpm in bpm_values if 135 <= bpm < 140),
-    }
+    # np.histogram включает правую границу последнего бина — отсекаем её, как в [lo, hi)
+    counts, _ = np.histogram(bpms[bpms < BPM_BIN_EDGES[-1]], bins=BPM_BIN_EDGES)
+    bpm_ranges = dict(zip(BPM_BIN_LABELS, counts.tolist(), strict=True))
 
     # Находим underpopulated ranges
     avg_per_range = sum(bpm_ranges.values()) / len(bpm_ranges) if bpm_ranges else 0
@@ -111,7 +86,7 @@ def analyze_playlist_gaps(tracks):
         "bpm_distribution": bpm_ranges,
         "sparse_bpm_ranges": sparse_ranges,
         "missing_keys": sorted(missing_keys),
-        "key_distribution": dict(key_distribution),
+        "key_distribution": key_distribution,
         "total_tracks": len(tracks),
     }
 
@@ -195,33 +170,52 @@ def recommend_track_criteria(gaps, priority="balance"):
 # ============================================================================
 
 
-def score_candidate_track(candidate, current_playlist, gaps):
-    """Оценка кандидата на добавление в плейлист"""
+def prepare_scoring_context(gaps):
+    """Предрасчёт структур для оценки кандидатов (один раз на весь пул)"""
+    sparse_labels = list(gaps["sparse_bpm_ranges"])
+    sparse_edges = np.array(
+        [[int(edge) for edge in label.split("-")] for label in sparse_labels], dtype=np.int32
+    ).reshape(-1, 2)
+
+    return {
+        "missing_keys": frozenset(gaps["missing_keys"]),
+        "present_keys": frozenset(gaps["key_distribution"]),
+        "key_distribution": gaps["key_distribution"],
+        "sparse_labels": sparse_labels,
+        "sparse_edges": sparse_edges,
+    }
+
+
+def score_candidate_track(candidate, context):
+    """Оценка кандидата на добавление в плейлист
+
+    context — результат prepare_scoring_context(gaps)
+    """
     score = 0
     reasons = []
 
     camelot = candidate.get("camelot")
     bpm = candidate.get("bpm")
     key_confidence = candidate.get("key_confidence", 0)
+    key_distribution = context["key_distribution"]
 
     # 1. Missing key bonus (+50 points)
-    if camelot in gaps["missing_keys"]:
+    if camelot in context["missing_keys"]:
         score += 50
         reasons.append(f"+50: Заполняет пробел в Camelot Wheel ({camelot})")
 
     # 2. Sparse BPM range bonus (+30 points)
     if bpm:
-        for bpm_range, _count in gaps["sparse_bpm_ranges"].items():
-            range_min, range_max = map(int, bpm_range.split("-"))
-            if range_min <= bpm < range_max:
-                score += 30
-                reasons.append(f"+30: BPM в sparse range ({bpm_range})")
-                break
+        sparse_edges = context["sparse_edges"]
+        mask = (sparse_edges[:, 0] <= bpm) & (bpm < sparse_edges[:, 1])
+        if mask.any():
+            score += 30
+            reasons.append(f"+30: BPM в sparse range ({context['sparse_labels'][mask.argmax()]})")
 
     # 3. Harmonic connectivity (+20 points)
     if camelot:
         compatible = CAMELOT_TRANSITIONS.get(camelot, [])
-        connectivity = sum(1 for k in compatible if k in gaps["key_distribution"].keys())
+        connectivity = sum(1 for k in compatible if k in context["present_keys"])
         connectivity_score = min(20, connectivity * 5)
         score += connectivity_score
         reasons.append(f"+{connectivity_score}: Совместим с {connectivity} ключами")
@@ -241,9 +235,9 @@ def score_candidate_track(candidate, current_playlist, gaps):
 
     # Penalties
     # -20: Duplicate key with many existing tracks
-    if camelot and gaps["key_distribution"].get(camelot, 0) >= 5:
+    if camelot and key_distribution.get(camelot, 0) >= 5:
         score -= 20
-        reasons.append(f"-20: Много треков в этом ключе ({gaps['key_distribution'][camelot]})")
+        reasons.append(f"-20: Много треков в этом ключе ({key_distribution[camelot]})")
 
     # -15: Very low key confidence
     if key_confidence < 0.25:
@@ -268,9 +262,8 @@ if __name__ == "__main__":
 
     # Загрузка метаданных
     logger.info(f"\n📋 Загрузка метаданных из {METADATA_FILE}...")
-    with open(METADATA_FILE, encoding="utf-8") as f:
-        data = json.load(f)
-        tracks = data["tracks"]
+    data = load_json(METADATA_FILE)
+    tracks = data["tracks"]
 
     logger.info(f"✓ Загружено {len(tracks)} треков\n")
 
@@ -284,7 +277,7 @@ if __name__ == "__main__":
     logger.info(f"\nBPM диапазон: {gaps['bpm_range'][0]:.1f} - {gaps['bpm_range'][1]:.1f}")
     logger.info("\nРаспределение по BPM:")
     for bpm_range, count in gaps["bpm_distribution"].items():
-        bar = "█" * min(count, 30)
+        bar = COUNT_BARS[min(count, 30)]
         sparse_marker = " ⚠️  (sparse)" if bpm_range in gaps["sparse_bpm_ranges"] else ""
         logger.info(f"  {bpm_range}: {count:2d} треков | {bar}{sparse_marker}")
 
@@ -343,8 +336,7 @@ if __name__ == "__main__":
         },
     }
 
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(recommendations_data, f, ensure_ascii=False, indent=2)
+    dump_json(output_file, recommendations_data)
 
     logger.info(f"✓ Сохранены рекомендации: {output_file}\n")
 
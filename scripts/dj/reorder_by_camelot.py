@@ -4,12 +4,16 @@
 Создает оптимальные последовательности для minimal/deep tech/progressive techno
 """
 
-import json
 import logging
+import math
 import sys
 from collections import defaultdict
 from pathlib import Path
 
+import numpy as np
+from camelot import CAMELOT_IDX, CAMELOT_TRANSITIONS_ARR
+from common import load_json
+
 # Настройка логирования
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s | %(levelname)-8s | %(message)s", datefmt="%H:%M:%S"
@@ -20,34 +24,23 @@ PROJECT_DIR = Path(__file__).parent
 DJ_SET_DIR = PROJECT_DIR / "dj_set_techno_2025"
 METADATA_FILE = DJ_SET_DIR / "tracklist_metadata.json"
 
-# Camelot Wheel: совместимые переходы
-CAMELOT_TRANSITIONS = {
-    # Format: camelot_code -> [perfect_match, energy_boost, mood_change]
-    "1A": ["1A", "2A", "12A", "1B"],
-    "2A": ["2A", "3A", "1A", "2B"],
-    "3A": ["3A", "4A", "2A", "3B"],
-    "4A": ["4A", "5A", "3A", "4B"],
-    "5A": ["5A", "6A", "4A", "5B"],
-    "6A": ["6A", "7A", "5A", "6B"],
-    "7A": ["7A", "8A", "6A", "7B"],
-    "8A": ["8A", "9A", "7A", "8B"],
-    "9A": ["9A", "10A", "8A", "9B"],
-    "10A": ["10A", "11A", "9A", "10B"],
-    "11A": ["11A", "12A", "10A", "11B"],
-    "12A": ["12A", "1A", "11A", "12B"],
-    "1B": ["1B", "2B", "12B", "1A"],
-    "2B": ["2B", "3B", "1B", "2A"],
-    "3B": ["3B", "4B", "2B", "3A"],
-    "4B": ["4B", "5B", "3B", "4A"],
-    "5B": ["5B", "6B", "4B", "5A"],
-    "6B": ["6B", "7B", "5B", "6A"],
-    "7B": ["7B", "8B", "6B", "7A"],
-    "8B": ["8B", "9B", "7B", "8A"],
-    "9B": ["9B", "10B", "8B", "9A"],
-    "10B": ["10B", "11B", "9B", "10A"],
-    "11B": ["11B", "12B", "10B", "11A"],
-    "12B": ["12B", "1B", "11B", "12A"],
-}
+# Таблица key-совместимости (текущий ключ, следующий ключ) -> очки (0-60)
+KEY_SCORE = np.full((24, 24), 10, dtype=np.int8)  # Плохая совместимость
+_rows = np.arange(24)
+KEY_SCORE[_rows, CAMELOT_TRANSITIONS_ARR[:, 3]] = 45  # Major/minor switch (mood change)
+KEY_SCORE[_rows, CAMELOT_TRANSITIONS_ARR[:, 2]] = 40  # ±1 обратно (energy decrease)
+KEY_SCORE[_rows, CAMELOT_TRANSITIONS_ARR[:, 1]] = 50  # ±1 на wheel (energy boost)
+KEY_SCORE[_rows, _rows] = 60  # Perfect match
+
+# Очки BPM-совместимости (0-40) по ceil(|ΔBPM|), все разницы больше 6 -> последний элемент
+BPM_SCORE = np.array([40, 35, 35, 25, 25, 15, 15, 5], dtype=np.int8)
+
+# Ширина beam search при построении цепочки (1 — жадный выбор следующего трека)
+BEAM_WIDTH = 4
+
+# Python-списки для скалярного пути: поэлементная индексация ndarray медленнее
+_KEY_SCORE_ROWS = KEY_SCORE.tolist()
+_BPM_SCORE_LIST = BPM_SCORE.tolist()
 
 
 def calculate_compatibility_score(current_camelot, next_camelot, current_bpm, next_bpm):
@@ -59,36 +52,17 @@ def calculate_compatibility_score(current_camelot, next_camelot, current_bpm, ne
 
     # Key compatibility (0-60 points)
     if current_camelot and next_camelot:
-        transitions = CAMELOT_TRANSITIONS.get(current_camelot, [])
-        if next_camelot == current_camelot:
-            score += 60  # Perfect match
-        elif next_camelot in transitions[:2]:  # ±1 на wheel
-            score += 50  # Energy boost
-        elif next_camelot in transitions[2:3]:  # ±1 обратно
-            score += 40  # Energy decrease
-        elif next_camelot == transitions[3]:  # Major/minor switch
-            score += 45  # Mood change
-        else:
-            score += 10  # Плохая совместимость
+        score += _KEY_SCORE_ROWS[CAMELOT_IDX[current_camelot]][CAMELOT_IDX[next_camelot]]
 
     # BPM compatibility (0-40 points)
     if current_bpm and next_bpm:
         bpm_diff = abs(next_bpm - current_bpm)
-        if bpm_diff == 0:
-            score += 40
-        elif bpm_diff <= 2:
-            score += 35
-        elif bpm_diff <= 4:
-            score += 25
-        elif bpm_diff <= 6:
-            score += 15
-        else:
-            score += 5
+        score += _BPM_SCORE_LIST[min(math.ceil(bpm_diff), len(_BPM_SCORE_LIST) - 1)]
 
     return score
 
 
-def build_harmonic_chain(tracks, start_key=None, strategy="progressive"):
+def build_harmonic_chain(tracks, start_key=None, strategy="progressive", beam_width=BEAM_WIDTH):
     """
     Построение гармонической цепочки треков
 
@@ -96,6 +70,12 @@ def build_harmonic_chain(tracks, start_key=None, strategy="progressive"):
     - 'progressive': постепенное нарастание энергии
     - 'plateau': длинные блоки в одном ключе
     - 'journey': разнообразие с гармоничными переходами
+
+    Цепочка строится beam search: на каждом шаге остаются beam_width лучших
+    частичных цепочек по сумме очков переходов (beam_width=1 — жадный выбор).
+
+    tracks не изменяется: состояние выбора хранится в alive масках,
+    поэтому вызывающему коду не нужно передавать копию списка.
     """
     if not tracks:
         return []
@@ -107,74 +87,97 @@ def build_harmonic_chain(tracks, start_key=None, strategy="progressive"):
         if camelot:
             by_camelot[camelot].append(track)
 
-    # Выбор стартового трека
-    if start_key and start_key in by_camelot:
-        current = by_camelot[start_key].pop(0)
-    else:
+    # Выбор стартового ключа
+    if not (start_key and start_key in by_camelot):
         # Начать с самого популярного ключа
-        popular_key = max(by_camelot.keys(), key=lambda k: len(by_camelot[k]))
-        current = by_camelot[popular_key].pop(0)
-
-    chain = [current]
-    used_tracks = {current["position"]}
-
-    # Построение цепочки
-    while len(chain) < len(tracks):
-        best_score = -1
-        best_track = None
-        best_camelot = None
-
-        current_camelot = current.get("camelot")
-        current_bpm = current.get("bpm")
-
-        # Найти лучший следующий трек
-        for camelot, candidates in by_camelot.items():
-            if not candidates:
-                continue
-
-            for track in candidates:
-                if track["position"] in used_tracks:
-                    continue
-
-                score = calculate_compatibility_score(
-                    current_camelot, camelot, current_bpm, track.get("bpm")
-                )
-
-                # Бонус за progressive стратегию (нарастание BPM)
-                if strategy == "progressive" and track.get("bpm", 0) > current_bpm:
-                    score += 10
-
-                # Бонус за plateau (те же BPM+key)
-                if (
-                    strategy == "plateau"
-                    and track.get("bpm") == current_bpm
-                    and camelot == current_camelot
-                ):
-                    score += 15
-
-                if score > best_score:
-                    best_score = score
-                    best_track = track
-                    best_camelot = camelot
-
-        if best_track:
-            chain.append(best_track)
-            used_tracks.add(best_track["position"])
-            by_camelot[best_camelot].remove(best_track)
-            current = best_track
-        else:
-            # Не нашли совместимый - берем любой оставшийся
-            for camelot, candidates in by_camelot.items():
-                remaining = [t for t in candidates if t["position"] not in used_tracks]
-                if remaining:
-                    track = remaining[0]
-                    chain.append(track)
-                    used_tracks.add(track["position"])
-                    by_camelot[camelot].remove(track)
-                    current = track
-                    break
-
-    return chain
+        start_key = max(by_camelot.keys(), key=lambda k: len(by_camelot[k]))
+
+    # Треки в порядке бакетов: при равных очках побеждает первый, как при переборе by_camelot
+    ordered = []
+    for camelot, candidates in by_camelot.items():
+        if camelot == start_key:
+            start = len(ordered)
+        ordered.extend(candidates)
+
+    # SoA массивы для векторизованной оценки кандидатов
+    count = len(ordered)
+    camelot_idx = np.fromiter(
+        (CAMELOT_IDX[t["camelot"]] for t in ordered), dtype=np.intp, count=count
+    )
+    bpm = np.fromiter((t.get("bpm") or 0 for t in ordered), dtype=float, count=count)
+
+    picks, total = _beam_search(camelot_idx, bpm, start, strategy, beam_width)
+    if beam_width > 1:
+        # Beam search не гарантирует результат лучше жадного: лучшие на ранних шагах
+        # цепочки могут "съесть" совместимые треки, поэтому жадная цепочка —
+        # нижняя граница (при равенстве остается она)
+        greedy_picks, greedy_total = _beam_search(camelot_idx, bpm, start, strategy, 1)
+        if greedy_total >= total:
+            picks = greedy_picks
+
+    return [ordered[i] for i in picks]
+
+
+def _beam_search(camelot_idx, bpm, start, strategy, beam_width):
+    """Beam search по SoA массивам треков
+
+    Returns:
+        tuple: (индексы треков лучшей цепочки, сумма очков ее переходов)
+    """
+    count = len(camelot_idx)
+
+    # Состояние beam: последний трек, alive маска и сумма очков каждой частичной цепочки
+    last = np.array([start])
+    alive = np.ones((1, count), dtype=bool)
+    alive[0, start] = False
+    totals = np.zeros(1, dtype=np.int64)
+    # Обратные ссылки на каждый шаг: (родительская цепочка, выбранный трек)
+    history = []
+
+    for remaining in range(count - 1, 0, -1):
+        # Очки переходов от последнего трека каждой цепочки ко всем трекам: (beams, tracks)
+        last_camelot = camelot_idx[last][:, None]
+        last_bpm = bpm[last][:, None]
+
+        # Key compatibility
+        scores = KEY_SCORE[last_camelot, camelot_idx].astype(np.int64)
+
+        # BPM compatibility (только если BPM известен у обоих треков)
+        bpm_diff = np.minimum(np.ceil(np.abs(bpm - last_bpm)), len(BPM_SCORE) - 1)
+        has_bpm = (last_bpm != 0) & (bpm != 0)
+        scores += np.where(has_bpm, BPM_SCORE[bpm_diff.astype(np.intp)], 0)
+
+        # Бонус за progressive стратегию (нарастание BPM)
+        if strategy == "progressive":
+            scores += 10 * (bpm > last_bpm)
+
+        # Бонус за plateau (те же BPM+key)
+        if strategy == "plateau":
+            scores += 15 * ((bpm == last_bpm) & (camelot_idx == last_camelot))
+
+        # Суммарные очки продолжений; уже использованные треки не участвуют
+        scores += totals[:, None]
+        scores[~alive] = -1
+
+        # Лучшие продолжения по убыванию; stable — при равенстве первое по порядку
+        flat = scores.ravel()
+        best = np.argsort(-flat, kind="stable")[: min(beam_width, len(last) * remaining)]
+        parents, last = np.divmod(best, count)
+        totals = flat[best]
+        alive = alive[parents]
+        alive[np.arange(len(last)), last] = False
+        history.append((parents, last))
+
+    # Лучшая цепочка — первая в beam; восстанавливаем ее по обратным ссылкам
+    picks = []
+    beam = 0
+    for parents, chosen in reversed(history):
+        picks.append(int(chosen[beam]))
+        beam = parents[beam]
+    picks.append(start)
+    picks.reverse()
+
+    return picks, int(totals[0])
 
 
 def generate_set_variations(tracks):
@@ -183,17 +186,17 @@ def generate_set_variations(tracks):
 
     # 1. Progressive Journey (120 → 130+ BPM)
     logger.info("\n🎚️  Генерация Progressive Journey...")
-    progressive = build_harmonic_chain(tracks.copy(), strategy="progressive")
+    progressive = build_harmonic_chain(tracks, strategy="progressive")
     variations["progressive"] = progressive
 
     # 2. Plateau Mix (long blocks in same key)
     logger.info("🎵 Генерация Plateau Mix...")
-    plateau = build_harmonic_chain(tracks.copy(), strategy="plateau")
+    plateau = build_harmonic_chain(tracks, strategy="plateau")
     variations["plateau"] = plateau
 
     # 3. Harmonic Journey (разнообразие)
     logger.info("🌊 Генерация Harmonic Journey...")
-    journey = build_harmonic_chain(tracks.copy(), strategy="journey")
+    journey = build_harmonic_chain(tracks, strategy="journey")
     variations["journey"] = journey
 
     return variations
@@ -206,34 +209,33 @@ def save_variation(tracks, name, output_dir):
 
     # M3U8
     m3u_file = var_dir / f"{name}.m3u8"
-    with open(m3u_file, "w", encoding="utf-8") as f:
-        f.write("#EXTM3U\n")
-        for _idx, track in enumerate(tracks, 1):
-            f.write(
-                f"#EXTINF:{int(track['duration_ms'] / 1000)},{track['artist']} - {track['title']}\n"
-            )
-            f.write(f"#EXTGENRE:{track['genre']}\n")
-            if track.get("bpm"):
-                f.write(f"#EXTBPM:{track['bpm']}\n")
-            if track.get("key"):
-                f.write(f"#EXTKEY:{track['key']}\n")
-            if track.get("camelot"):
-                f.write(f"#EXTCAMELOT:{track['camelot']}\n")
-            f.write(f"{track['filename']}\n")
+    lines = ["#EXTM3U"]
+    for track in tracks:
+        lines.append(
+            f"#EXTINF:{int(track['duration_ms'] / 1000)},{track['artist']} - {track['title']}"
+        )
+        lines.append(f"#EXTGENRE:{track['genre']}")
+        if track.get("bpm"):
+            lines.append(f"#EXTBPM:{track['bpm']}")
+        if track.get("key"):
+            lines.append(f"#EXTKEY:{track['key']}")
+        if track.get("camelot"):
+            lines.append(f"#EXTCAMELOT:{track['camelot']}")
+        lines.append(track["filename"])
+    m3u_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
 
     # Tracklist TXT
     txt_file = var_dir / f"{name}_tracklist.txt"
-    with open(txt_file, "w", encoding="utf-8") as f:
-        f.write("═══════════════════════════════════════════\n")
-        f.write(f"  {name.upper().replace('_', ' ')}\n")
-        f.write("═══════════════════════════════════════════\n\n")
-
-        for idx, track in enumerate(tracks, 1):
-            bpm = track.get("bpm", "???")
-            key = track.get("key", "???")
-            camelot = track.get("camelot", "???")
-            f.write(f"{idx:02d}. {track['artist']} - {track['title']}\n")
-            f.write(f"    {bpm} BPM | {key} ({camelot}) | {track['genre']}\n\n")
+    border = "═══════════════════════════════════════════"
+    lines = [border, f"  {name.upper().replace('_', ' ')}", border, ""]
+    for idx, track in enumerate(tracks, 1):
+        bpm = track.get("bpm", "???")
+        key = track.get("key", "???")
+        camelot = track.get("camelot", "???")
+        lines.append(f"{idx:02d}. {track['artist']} - {track['title']}")
+        lines.append(f"    {bpm} BPM | {key} ({camelot}) | {track['genre']}")
+        lines.append("")
+    txt_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
 
     logger.info(f"✓ Сохранено: {var_dir}")
 
@@ -248,9 +250,8 @@ logger.info("=" * 70)
 
 # Загрузка метаданных
 logger.info(f"\n📋 Загрузка метаданных из {METADATA_FILE}...")
-with open(METADATA_FILE, encoding="utf-8") as f:
-    data = json.load(f)
-    tracks = data["tracks"]
+data = load_json(METADATA_FILE)
+tracks = data["tracks"]
 
 logger.info(f"✓ Загружено {len(tracks)} треков")
 
@@ -285,11 +286,12 @@ logger.info("=" * 70)
 for name, track_list in variations.items():
     bpms = [t["bpm"] for t in track_list if t.get("bpm")]
     keys = [t["camelot"] for t in track_list if t.get("camelot")]
+    bpm_arr = np.asarray(bpms, dtype=float)
 
     logger.info(f"\n{name.upper()}:")
     logger.info(f"  Треков: {len(track_list)}")
-    logger.info(f"  BPM: {min(bpms):.1f} → {max(bpms):.1f}")
-    logger.info(f"  Keys: {len(set(keys))} unique")
+    logger.info(f"  BPM: {bpm_arr.min():.1f} → {bpm_arr.max():.1f}")
+    logger.info(f"  Keys: {np.unique(keys).size} unique")
     logger.info(f"  Start: {keys[0]} @ {bpms[0]} BPM")
     logger.info(f"  End:   {keys[-1]} @ {bpms[-1]} BPM")
 
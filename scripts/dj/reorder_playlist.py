@@ -4,6 +4,9 @@
 import logging
 import shutil
 import sys
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import accumulate
 from pathlib import Path
 
 from yandex_music import Client
@@ -24,6 +27,8 @@ PLAYLIST_ID = "250905515/1113"
 PROJECT_DIR = Path(__file__).parent  # Директория где находится скрипт
 SOURCE_DIR = PROJECT_DIR / "music_download"
 TARGET_DIR = PROJECT_DIR / "dj_set_techno_2025"
+# Параллельные копирования: упираются в диск, а не в CPU
+COPY_WORKERS = 16
 
 if not TOKEN:
     logger.error("Токен не указан")
@@ -52,31 +57,65 @@ except Exception as e:
 # Создание целевой директории
 TARGET_DIR.mkdir(exist_ok=True)
 logger.info(f"📁 Целевая директория: {TARGET_DIR}")
+
+# Индекс исходных файлов: один обход диска вместо rglob на каждый трек.
+# Целевую директорию пропускаем, чтобы не копировать файлы сами на себя
+source_files = [
+    file_path for file_path in SOURCE_DIR.rglob("*.m4a") if TARGET_DIR not in file_path.parents
+]
+# Путь директории каждого файла — для поиска по исполнителю (строка строится один раз)
+parent_dirs = {file_path: str(file_path.parent) for file_path in source_files}
+logger.info(f"🔎 Файлов в {SOURCE_DIR.name}: {len(source_files)}")
 logger.info("")
 
+# Все имена файлов одной строкой через \0: поиск названия — проход str.find на C
+# по всему буферу вместо проверки каждого файла в Python цикле
+names_blob = "\0".join(file_path.name for file_path in source_files)
+# Смещения начала каждого имени в names_blob (+ сентинел за концом буфера)
+name_starts = [0, *accumulate(len(file_path.name) + 1 for file_path in source_files)]
+
+
+def find_candidates(title):
+    """Файлы, в имени которых встречается title (в порядке обхода SOURCE_DIR)"""
+    candidates = []
+    if not source_files:
+        return candidates
+
+    start = 0
+    while (pos := names_blob.find(title, start)) != -1:
+        file_idx = bisect_right(name_starts, pos) - 1
+        candidates.append(source_files[file_idx])
+        # Следующее совпадение ищем уже в следующем имени
+        start = name_starts[file_idx + 1]
+    return candidates
+
+
+def copy_track(found_file, target_file):
+    """Копирование файла трека, возвращает размер копии в MB"""
+    shutil.copy2(found_file, target_file)
+    return target_file.stat().st_size / (1024 * 1024)
+
+
 # Статистика
 stats = {"success": 0, "not_found": 0, "errors": 0}
+# Найденные файлы для копирования: (idx, artists, title, found_file, target_file)
+copy_jobs = []
 
 for idx, track_short in enumerate(playlist.tracks, 1):
     track = track_short.track
 
     # Формирование имени файла
-    artists = ", ".join([artist.name for artist in track.artists])
+    artist_names = [artist.name for artist in track.artists]
+    artists = ", ".join(artist_names)
     title = track.title
 
     logger.debug(f"[{idx:02d}/{len(playlist.tracks)}] Обработка: {artists} - {title}")
 
     # Поиск файла в SOURCE_DIR
     found_file = None
-    candidates = []
 
     logger.debug(f"  Поиск по названию: '{title}'")
-    for file_path in SOURCE_DIR.rglob("*.m4a"):
-        # Пропускаем целевую директорию чтобы не копировать файлы сами на себя
-        if TARGET_DIR in file_path.parents:
-            continue
-        if title in file_path.name or file_path.stem.endswith(title):
-            candidates.append(file_path)
+    candidates = find_candidates(title)
 
     logger.debug(f"  Найдено кандидатов: {len(candidates)}")
 
@@ -88,7 +127,8 @@ for idx, track_short in enumerate(playlist.tracks, 1):
     elif len(candidates) > 1:
         logger.debug("  Множественные кандидаты, поиск по исполнителю...")
         for candidate in candidates:
-            if any(artist.name in str(candidate.parent) for artist in track.artists):
+            parent_dir = parent_dirs[candidate]
+            if any(name in parent_dir for name in artist_names):
                 found_file = candidate
                 logger.debug(f"  ✓ Найден по исполнителю: {candidate.name}")
                 break
@@ -109,17 +149,25 @@ for idx, track_short in enumerate(playlist.tracks, 1):
 
     target_file = TARGET_DIR / new_name
 
-    # Копирование файла
-    try:
-        shutil.copy2(found_file, target_file)
-        file_size = target_file.stat().st_size / (1024 * 1024)  # MB
-        logger.info(
-            f"✅ [{idx:02d}/{len(playlist.tracks)}] {artists} - {title} ({file_size:.1f} MB)"
-        )
-        stats["success"] += 1
-    except Exception as e:
-        logger.error(f"❌ [{idx:02d}/{len(playlist.tracks)}] Ошибка копирования: {e}")
-        stats["errors"] += 1
+    copy_jobs.append((idx, artists, title, found_file, target_file))
+
+# Копирование файлов параллельно, результаты логируются по мере завершения
+with ThreadPoolExecutor(max_workers=COPY_WORKERS) as executor:
+    futures = {
+        executor.submit(copy_track, found_file, target_file): (idx, artists, title)
+        for idx, artists, title, found_file, target_file in copy_jobs
+    }
+    for future in as_completed(futures):
+        idx, artists, title = futures[future]
+        try:
+            file_size = future.result()
+            logger.info(
+                f"✅ [{idx:02d}/{len(playlist.tracks)}] {artists} - {title} ({file_size:.1f} MB)"
+            )
+            stats["success"] += 1
+        except Exception as e:
+            logger.error(f"❌ [{idx:02d}/{len(playlist.tracks)}] Ошибка копирования: {e}")
+            stats["errors"] += 1
 
 # Итоговая статистика
 logger.info("")
@@ -4,11 +4,17 @@
 Проверяет BPM, Key confidence, Energy flow, Harmonic compatibility
 """
 
-import json
 import logging
-from collections import Counter, defaultdict
+from collections import Counter
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass
+from itertools import islice
 from pathlib import Path
 
+import numpy as np
+from camelot import CAMELOT_CODES, CAMELOT_IDX, CAMELOT_TRANSITIONS, CAMELOT_TRANSITIONS_ARR
+from common import COUNT_BARS, dump_json, load_json
+
 # Настройка логирования
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s | %(levelname)-8s | %(message)s", datefmt="%H:%M:%S"
@@ -23,54 +29,44 @@ METADATA_FILE = DJ_SET_DIR / "tracklist_metadata.json"
 # КРИТЕРИИ ВАЛИДАЦИИ
 # ============================================================================
 
-VALIDATION_CRITERIA = {
+
+@dataclass(frozen=True, slots=True)
+class ValidationCriteria:
+    """Пороги валидации треков"""
+
     # BPM диапазон для techno/house
-    "bpm_min": 115,
-    "bpm_max": 140,
-    "bpm_optimal_min": 120,
-    "bpm_optimal_max": 135,
+    bpm_min: int = 115
+    bpm_max: int = 140
+    bpm_optimal_min: int = 120
+    bpm_optimal_max: int = 135
     # Key detection confidence
-    "key_confidence_min": 0.25,  # Минимальная уверенность
-    "key_confidence_good": 0.35,  # Хорошая уверенность
+    key_confidence_min: float = 0.25  # Минимальная уверенность
+    key_confidence_good: float = 0.35  # Хорошая уверенность
     # Energy level
-    "energy_min": 2.0,
-    "energy_max": 10.0,
-    "energy_jump_max": 3.0,  # Максимальный скачок между треками
+    energy_min: float = 2.0
+    energy_max: float = 10.0
+    energy_jump_max: float = 3.0  # Максимальный скачок между треками
     # Duration
-    "duration_min": 120,  # 2 минуты
-    "duration_max": 600,  # 10 минут
+    duration_min: int = 120  # 2 минуты
+    duration_max: int = 600  # 10 минут
     # Camelot Wheel coverage
-    "min_keys_diversity": 8,  # Минимум 8 разных ключей
-}
-
-
-# Camelot Wheel transitions для проверки совместимости
-CAMELOT_TRANSITIONS = {
-    "1A": ["1A", "2A", "12A", "1B"],
-    "2A": ["2A", "3A", "1A", "2B"],
-    "3A": ["3A", "4A", "2A", "3B"],
-    "4A": ["4A", "5A", "3A", "4B"],
-    "5A": ["5A", "6A", "4A", "5B"],
-    "6A": ["6A", "7A", "5A", "6B"],
-    "7A": ["7A", "8A", "6A", "7B"],
-    "8A": ["8A", "9A", "7A", "8B"],
-    "9A": ["9A", "10A", "8A", "9B"],
-    "10A": ["10A", "11A", "9A", "10B"],
-    "11A": ["11A", "12A", "10A", "11B"],
-    "12A": ["12A", "1A", "11A", "12B"],
-    "1B": ["1B", "2B", "12B", "1A"],
-    "2B": ["2B", "3B", "1B", "2A"],
-    "3B": ["3B", "4B", "2B", "3A"],
-    "4B": ["4B", "5B", "3B", "4A"],
-    "5B": ["5B", "6B", "4B", "5A"],
-    "6B": ["6B", "7B", "5B", "6A"],
-    "7B": ["7B", "8B", "6B", "7A"],
-    "8B": ["8B", "9B", "7B", "8A"],
-    "9B": ["9B", "10B", "8B", "9A"],
-    "10B": ["10B", "11B", "9B", "10A"],
-    "11B": ["11B", "12B", "10B", "11A"],
-    "12B": ["12B", "1B", "11B", "12A"],
-}
+    min_keys_diversity: int = 8  # Минимум 8 разных ключей
+
+
+VALIDATION_CRITERIA = ValidationCriteria()
+
+
+def as_criteria(criteria):
+    """ValidationCriteria из словаря порогов (прежний формат criteria) или как есть"""
+    if isinstance(criteria, Mapping):
+        return ValidationCriteria(**criteria)
+    return criteria
+
+
+# Матрица смежности: KEY_ADJACENCY[i, j] — ключ j совместим с ключом i (кроме самого i)
+KEY_ADJACENCY = np.zeros((24, 24), dtype=bool)
+KEY_ADJACENCY[np.arange(24)[:, None], CAMELOT_TRANSITIONS_ARR] = True
+np.fill_diagonal(KEY_ADJACENCY, False)
 
 
 # ============================================================================
@@ -79,7 +75,11 @@ CAMELOT_TRANSITIONS = {
 
 
 def validate_track(track, criteria=VALIDATION_CRITERIA):
-    """Проверка трека по критериям качества"""
+    """Проверка трека по критериям качества
+
+    criteria — ValidationCriteria или словарь с теми же ключами
+    """
+    criteria = as_criteria(criteria)
     issues = []
     warnings = []
     score = 100.0  # Начальный score
@@ -89,12 +89,12 @@ def validate_track(track, criteria=VALIDATION_CRITERIA):
     if not bpm:
         issues.append("Отсутствует BPM")
         score -= 50
-    elif bpm < criteria["bpm_min"] or bpm > criteria["bpm_max"]:
-        issues.append(f"BPM {bpm} вне диапазона {criteria['bpm_min']}-{criteria['bpm_max']}")
+    elif bpm < criteria.bpm_min or bpm > criteria.bpm_max:
+        issues.append(f"BPM {bpm} вне диапазона {criteria.bpm_min}-{criteria.bpm_max}")
         score -= 30
-    elif bpm < criteria["bpm_optimal_min"] or bpm > criteria["bpm_optimal_max"]:
+    elif bpm < criteria.bpm_optimal_min or bpm > criteria.bpm_optimal_max:
         warnings.append(
-            f"BPM {bpm} не в оптимальном диапазоне {criteria['bpm_optimal_min']}-{criteria['bpm_optimal_max']}"
+            f"BPM {bpm} не в оптимальном диапазоне {criteria.bpm_optimal_min}-{criteria.bpm_optimal_max}"
         )
         score -= 5
 
@@ -106,10 +106,10 @@ def validate_track(track, criteria=VALIDATION_CRITERIA):
     if not key or not camelot:
         issues.append("Отсутствует Key detection")
         score -= 40
-    elif confidence < criteria["key_confidence_min"]:
+    elif confidence < criteria.key_confidence_min:
         issues.append(f"Key confidence слишком низкий: {confidence:.2f}")
         score -= 25
-    elif confidence < criteria["key_confidence_good"]:
+    elif confidence < criteria.key_confidence_good:
         warnings.append(f"Key confidence ниже оптимального: {confidence:.2f}")
         score -= 10
 
@@ -118,19 +118,19 @@ def validate_track(track, criteria=VALIDATION_CRITERIA):
     if not energy:
         warnings.append("Отсутствует Energy level")
         score -= 5
-    elif energy < criteria["energy_min"] or energy > criteria["energy_max"]:
+    elif energy < criteria.energy_min or energy > criteria.energy_max:
         warnings.append(
-            f"Energy {energy} вне диапазона {criteria['energy_min']}-{criteria['energy_max']}"
+            f"Energy {energy} вне диапазона {criteria.energy_min}-{criteria.energy_max}"
         )
         score -= 5
 
     # 4. Duration проверка
     duration = track.get("duration")
     if duration:
-        if duration < criteria["duration_min"]:
+        if duration < criteria.duration_min:
             warnings.append(f"Трек слишком короткий: {duration}s")
             score -= 10
-        elif duration > criteria["duration_max"]:
+        elif duration > criteria.duration_max:
             warnings.append(f"Трек слишком длинный: {duration}s")
             score -= 5
 
@@ -156,20 +156,26 @@ def validate_track(track, criteria=VALIDATION_CRITERIA):
 
 def analyze_playlist_quality(tracks, criteria=VALIDATION_CRITERIA):
     """Анализ качества всего плейлиста"""
+    criteria = as_criteria(criteria)
     results = []
+    status_counts = Counter()
+    score_sum = 0.0
 
+    # Один проход: валидация + накопление статистики
     for track in tracks:
         validation = validate_track(track, criteria)
         results.append({"track": track, "validation": validation})
+        status_counts[validation["status"]] += 1
+        score_sum += validation["score"]
 
     # Статистика
     stats = {
         "total": len(tracks),
-        "excellent": sum(1 for r in results if r["validation"]["status"] == "EXCELLENT"),
-        "good": sum(1 for r in results if r["validation"]["status"] == "GOOD"),
-        "acceptable": sum(1 for r in results if r["validation"]["status"] == "ACCEPTABLE"),
-        "poor": sum(1 for r in results if r["validation"]["status"] == "POOR"),
-        "reject": sum(1 for r in results if r["validation"]["status"] == "REJECT"),
+        "excellent": status_counts["EXCELLENT"],
+        "good": status_counts["GOOD"],
+        "acceptable": status_counts["ACCEPTABLE"],
+        "poor": status_counts["POOR"],
+        "reject": status_counts["REJECT"],
     }
 
     stats["pass_rate"] = (
@@ -177,62 +183,65 @@ def analyze_playlist_quality(tracks, criteria=VALIDATION_CRITERIA):
         if stats["total"] > 0
         else 0
     )
-    stats["avg_score"] = (
-        sum(r["validation"]["score"] for r in results) / len(results) if results else 0
-    )
+    stats["avg_score"] = score_sum / len(results) if results else 0
 
     return results, stats
 
 
+def camelot_codes(tracks):
+    """Индексы Camelot ключей треков (-1 — ключ отсутствует или неизвестен)"""
+    return np.fromiter(
+        (CAMELOT_IDX.get(t.get("camelot"), -1) for t in tracks), dtype=np.intp, count=len(tracks)
+    )
+
+
 def analyze_camelot_coverage(tracks):
     """Анализ покрытия Camelot Wheel"""
-    key_distribution = Counter(t.get("camelot") for t in tracks if t.get("camelot"))
+    codes = camelot_codes(tracks)
+    codes = codes[codes >= 0]
+    counts = np.bincount(codes, minlength=24)
+    present = counts > 0
+    total_keys = int(present.sum())
 
-    all_keys = set(CAMELOT_TRANSITIONS.keys())
-    present_keys = set(key_distribution.keys())
-    missing_keys = all_keys - present_keys
+    # Проверка гармонической связности: нет ни одного присутствующего соседа
+    isolated = present & ~(KEY_ADJACENCY & present).any(axis=1)
 
-    # Проверка гармонической связности
-    isolated_keys = []
-    for key in present_keys:
-        compatible = CAMELOT_TRANSITIONS.get(key, [])
-        has_neighbors = any(k in present_keys for k in compatible if k != key)
-        if not has_neighbors:
-            isolated_keys.append(key)
+    # Порядок как у Counter.most_common: по убыванию, при равенстве — по первому появлению
+    first_seen = np.full(24, len(codes))
+    np.minimum.at(first_seen, codes, np.arange(len(codes)))
+    order = np.lexsort((first_seen, -counts))[:total_keys]
 
     return {
-        "total_keys": len(present_keys),
-        "missing_keys": sorted(missing_keys),
-        "isolated_keys": isolated_keys,
-        "distribution": dict(key_distribution.most_common()),
-        "coverage_percent": (len(present_keys) / len(all_keys) * 100),
+        "total_keys": total_keys,
+        "missing_keys": sorted(CAMELOT_CODES[i] for i in np.flatnonzero(~present)),
+        "isolated_keys": [CAMELOT_CODES[i] for i in np.flatnonzero(isolated)],
+        "distribution": {CAMELOT_CODES[i]: int(counts[i]) for i in order},
+        "coverage_percent": (total_keys / len(CAMELOT_CODES) * 100),
     }
 
 
 def analyze_energy_flow(tracks):
     """Анализ энергетического потока"""
-    issues = []
+    energies = [track.get("energy", 5.0) for track in tracks]
 
-    for i in range(len(tracks) - 1):
+    # Скачки энергии между соседними треками одним векторным проходом
+    jumps = np.abs(np.diff(np.asarray(energies, dtype=np.float64)))
+    positions = np.flatnonzero(jumps > VALIDATION_CRITERIA.energy_jump_max)
+
+    issues = []
+    for i in positions.tolist():
         current = tracks[i]
         next_track = tracks[i + 1]
-
-        current_energy = current.get("energy", 5.0)
-        next_energy = next_track.get("energy", 5.0)
-
-        energy_jump = abs(next_energy - current_energy)
-
-        if energy_jump > VALIDATION_CRITERIA["energy_jump_max"]:
-            issues.append(
-                {
-                    "position": i + 1,
-                    "from": f"{current['artist']} - {current['title']}",
-                    "to": f"{next_track['artist']} - {next_track['title']}",
-                    "jump": energy_jump,
-                    "from_energy": current_energy,
-                    "to_energy": next_energy,
-                }
-            )
+        issues.append(
+            {
+                "position": i + 1,
+                "from": f"{current['artist']} - {current['title']}",
+                "to": f"{next_track['artist']} - {next_track['title']}",
+                "jump": float(jumps[i]),
+                "from_energy": energies[i],
+                "to_energy": energies[i + 1],
+            }
+        )
 
     return issues
 
@@ -242,14 +251,19 @@ def analyze_energy_flow(tracks):
 # ============================================================================
 
 
-def filter_tracks(tracks, min_score=60, reject_issues=True):
-    """Фильтрация треков по критериям качества"""
+def filter_tracks(tracks, min_score=60, reject_issues=True, validations=None):
+    """Фильтрация треков по критериям качества
+
+    validations — уже посчитанные validate_track для tracks (например, из
+    analyze_playlist_quality), чтобы не валидировать треки повторно
+    """
     filtered = []
     rejected = []
 
-    for track in tracks:
-        validation = validate_track(track)
+    if validations is None:
+        validations = [validate_track(track) for track in tracks]
 
+    for track, validation in zip(tracks, validations, strict=True):
         if reject_issues and validation["issues"]:
             rejected.append({"track": track, "validation": validation})
         elif validation["score"] < min_score:
@@ -262,48 +276,37 @@ def filter_tracks(tracks, min_score=60, reject_issues=True):
 
 def suggest_missing_keys(tracks, target_coverage=12):
     """Рекомендации каких ключей не хватает"""
-    key_distribution = Counter(t.get("camelot") for t in tracks if t.get("camelot"))
-    present_keys = set(key_distribution.keys())
-    all_keys = set(CAMELOT_TRANSITIONS.keys())
-    missing_keys = all_keys - present_keys
+    codes = camelot_codes(tracks)
+    present = np.bincount(codes[codes >= 0], minlength=24) > 0
 
     # Приоритизация: какие ключи важнее добавить
     priority_keys = []
-    for missing_key in missing_keys:
-        # Считаем сколько присутствующих ключей совместимы с этим
-        compatible = CAMELOT_TRANSITIONS.get(missing_key, [])
-        compatibility_count = sum(1 for k in compatible if k in present_keys)
+    for idx in np.flatnonzero(~present):
+        missing_key = CAMELOT_CODES[idx]
+        # Присутствующие ключи, совместимые с этим
+        compatible_with = [k for k in CAMELOT_TRANSITIONS[missing_key] if present[CAMELOT_IDX[k]]]
 
         priority_keys.append(
             {
                 "key": missing_key,
-                "compatibility_count": compatibility_count,
-                "compatible_with": [k for k in compatible if k in present_keys],
+                "compatibility_count": len(compatible_with),
+                "compatible_with": compatible_with,
             }
         )
 
     # Сортируем по совместимости (чем больше, тем приоритетнее)
     priority_keys.sort(key=lambda x: x["compatibility_count"], reverse=True)
 
-    return priority_keys[: target_coverage - len(present_keys)]
+    return priority_keys[: target_coverage - int(present.sum())]
 
 
 # ============================================================================
-# MAIN
+# ОТЧЕТ
 # ============================================================================
 
-if __name__ == "__main__":
-    logger.info("=" * 70)
-    logger.info("🔍 ВАЛИДАЦИЯ И ФИЛЬТРАЦИЯ ПЛЕЙЛИСТА")
-    logger.info("=" * 70)
 
-    # Загрузка метаданных
-    logger.info(f"\n📋 Загрузка метаданных из {METADATA_FILE}...")
-    with open(METADATA_FILE, encoding="utf-8") as f:
-        data = json.load(f)
-        tracks = data["tracks"]
-
-    logger.info(f"✓ Загружено {len(tracks)} треков\n")
+def run(tracks):
+    """Полный отчет валидации плейлиста и сохранение отфильтрованного трек-листа"""
 
     # ========================================================================
     # 1. АНАЛИЗ КАЧЕСТВА ТРЕКОВ
@@ -314,44 +317,48 @@ if __name__ == "__main__":
     logger.info("=" * 70)
 
     results, stats = analyze_playlist_quality(tracks)
+    # Доля в процентах: одно деление вместо деления на total в каждой строке
+    pct = 100.0 / stats["total"] if stats["total"] else 0.0
 
     logger.info("\nСтатистика качества:")
     logger.info(
-        f"  ✅ Excellent:  {stats['excellent']:2d}/{stats['total']} ({stats['excellent'] / stats['total'] * 100:.1f}%)"
+        f"  ✅ Excellent:  {stats['excellent']:2d}/{stats['total']} ({stats['excellent'] * pct:.1f}%)"
     )
     logger.info(
-        f"  ✅ Good:       {stats['good']:2d}/{stats['total']} ({stats['good'] / stats['total'] * 100:.1f}%)"
+        f"  ✅ Good:       {stats['good']:2d}/{stats['total']} ({stats['good'] * pct:.1f}%)"
     )
     logger.info(
-        f"  ⚠️  Acceptable: {stats['acceptable']:2d}/{stats['total']} ({stats['acceptable'] / stats['total'] * 100:.1f}%)"
+        f"  ⚠️  Acceptable: {stats['acceptable']:2d}/{stats['total']} ({stats['acceptable'] * pct:.1f}%)"
     )
     logger.info(
-        f"  🔴 Poor:       {stats['poor']:2d}/{stats['total']} ({stats['poor'] / stats['total'] * 100:.1f}%)"
+        f"  🔴 Poor:       {stats['poor']:2d}/{stats['total']} ({stats['poor'] * pct:.1f}%)"
     )
     logger.info(
-        f"  ❌ Reject:     {stats['reject']:2d}/{stats['total']} ({stats['reject'] / stats['total'] * 100:.1f}%)"
+        f"  ❌ Reject:     {stats['reject']:2d}/{stats['total']} ({stats['reject'] * pct:.1f}%)"
     )
     logger.info(f"\n  Pass Rate: {stats['pass_rate']:.1f}%")
     logger.info(f"  Avg Score: {stats['avg_score']:.1f}/100")
 
-    # Показать проблемные треки
+    # Показать проблемные треки (вывод каждой секции собирается в одну запись лога)
     problematic = [r for r in results if r["validation"]["status"] in ["POOR", "REJECT"]]
     if problematic:
         logger.info(f"\n⚠️  Проблемные треки ({len(problematic)}):\n")
-        for r in problematic[:10]:  # Показываем первые 10
+        lines = []
+        for r in islice(problematic, 10):  # Показываем первые 10
             track = r["track"]
             val = r["validation"]
-            logger.info(
+            lines.append(
                 f"  [{val['status']:10}] {track['artist'][:30]:30} - {track['title'][:30]:30}"
             )
-            logger.info(f"              Score: {val['score']:.1f}/100")
+            lines.append(f"              Score: {val['score']:.1f}/100")
             if val["issues"]:
                 for issue in val["issues"]:
-                    logger.info(f"              ❌ {issue}")
+                    lines.append(f"              ❌ {issue}")
             if val["warnings"]:
-                for warning in val["warnings"][:2]:
-                    logger.info(f"              ⚠️  {warning}")
-            logger.info("")
+                for warning in islice(val["warnings"], 2):
+                    lines.append(f"              ⚠️  {warning}")
+            lines.append("")
+        logger.info("\n".join(lines))
 
     # ========================================================================
     # 2. АНАЛИЗ CAMELOT WHEEL COVERAGE
@@ -369,16 +376,19 @@ if __name__ == "__main__":
 
     if camelot_analysis["missing_keys"]:
         logger.info(f"\n  Отсутствующие ключи ({len(camelot_analysis['missing_keys'])}):")
-        logger.info(f"    {', '.join(camelot_analysis['missing_keys'][:12])}")
+        logger.info(f"    {', '.join(islice(camelot_analysis['missing_keys'], 12))}")
 
     if camelot_analysis["isolated_keys"]:
         logger.info("\n  ⚠️  Изолированные ключи (нет совместимых):")
         logger.info(f"    {', '.join(camelot_analysis['isolated_keys'])}")
 
+    # distribution уже упорядочен по убыванию (как most_common)
     logger.info("\n  Распределение по ключам (топ 10):")
-    for key, count in list(camelot_analysis["distribution"].items())[:10]:
-        bar = "█" * min(count, 30)
-        logger.info(f"    {key:4} | {count:2d} треков | {bar}")
+    lines = []
+    for key, count in islice(camelot_analysis["distribution"].items(), 10):
+        bar = COUNT_BARS[min(count, 30)]
+        lines.append(f"    {key:4} | {count:2d} треков | {bar}")
+    logger.info("\n".join(lines))
 
     # ========================================================================
     # 3. АНАЛИЗ ENERGY FLOW
@@ -391,15 +401,17 @@ if __name__ == "__main__":
     energy_issues = analyze_energy_flow(tracks)
 
     if energy_issues:
-        logger.info(f"\n⚠️  Резкие скачки энергии (>{VALIDATION_CRITERIA['energy_jump_max']}):\n")
-        for issue in energy_issues[:5]:
-            logger.info(f"  Позиция {issue['position']:2d}:")
-            logger.info(f"    От: {issue['from'][:50]}")
-            logger.info(f"        Energy: {issue['from_energy']:.1f}")
-            logger.info(f"    К:  {issue['to'][:50]}")
-            logger.info(f"        Energy: {issue['to_energy']:.1f}")
-            logger.info(f"    Скачок: {issue['jump']:.1f} ⚠️")
-            logger.info("")
+        logger.info(f"\n⚠️  Резкие скачки энергии (>{VALIDATION_CRITERIA.energy_jump_max}):\n")
+        lines = []
+        for issue in islice(energy_issues, 5):
+            lines.append(f"  Позиция {issue['position']:2d}:")
+            lines.append(f"    От: {issue['from'][:50]}")
+            lines.append(f"        Energy: {issue['from_energy']:.1f}")
+            lines.append(f"    К:  {issue['to'][:50]}")
+            lines.append(f"        Energy: {issue['to_energy']:.1f}")
+            lines.append(f"    Скачок: {issue['jump']:.1f} ⚠️")
+            lines.append("")
+        logger.info("\n".join(lines))
     else:
         logger.info("\n✅ Energy flow плавный, резких скачков нет")
 
@@ -411,25 +423,26 @@ if __name__ == "__main__":
     logger.info("🔧 ФИЛЬТРАЦИЯ ТРЕКОВ")
     logger.info("=" * 70)
 
-    filtered, rejected = filter_tracks(tracks, min_score=60, reject_issues=True)
+    filtered, rejected = filter_tracks(
+        tracks,
+        min_score=60,
+        reject_issues=True,
+        validations=[r["validation"] for r in results],
+    )
 
     logger.info("\nРезультаты фильтрации:")
-    logger.info(
-        f"  ✅ Приняты:   {len(filtered)}/{len(tracks)} ({len(filtered) / len(tracks) * 100:.1f}%)"
-    )
-    logger.info(
-        f"  ❌ Отклонены: {len(rejected)}/{len(tracks)} ({len(rejected) / len(tracks) * 100:.1f}%)"
-    )
+    logger.info(f"  ✅ Приняты:   {len(filtered)}/{len(tracks)} ({len(filtered) * pct:.1f}%)")
+    logger.info(f"  ❌ Отклонены: {len(rejected)}/{len(tracks)} ({len(rejected) * pct:.1f}%)")
 
     if rejected:
         logger.info("\n  Причины отклонения:")
-        reject_reasons = defaultdict(int)
-        for r in rejected:
-            for issue in r["validation"]["issues"]:
-                reject_reasons[issue] += 1
+        reject_reasons = Counter(issue for r in rejected for issue in r["validation"]["issues"])
 
-        for reason, count in sorted(reject_reasons.items(), key=lambda x: x[1], reverse=True):
-            logger.info(f"    {count:2d}x - {reason}")
+        logger.info(
+            "\n".join(
+                f"    {count:2d}x - {reason}" for reason, count in reject_reasons.most_common()
+            )
+        )
 
     # Сохранение отфильтрованного плейлиста
     if len(filtered) < len(tracks):
@@ -440,12 +453,11 @@ if __name__ == "__main__":
                 "original_count": len(tracks),
                 "filtered_count": len(filtered),
                 "rejected_count": len(rejected),
-                "filter_criteria": VALIDATION_CRITERIA,
+                "filter_criteria": asdict(VALIDATION_CRITERIA),
             },
         }
 
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(data_filtered, f, ensure_ascii=False, indent=2)
+        dump_json(output_file, data_filtered)
 
         logger.info(f"\n✓ Сохранен отфильтрованный плейлист: {output_file}")
 
@@ -461,10 +473,12 @@ if __name__ == "__main__":
 
     if suggestions:
         logger.info("\nРекомендуемые ключи для добавления:")
-        for i, suggestion in enumerate(suggestions[:8], 1):
-            logger.info(
+        logger.info(
+            "\n".join(
                 f"  {i}. {suggestion['key']} - совместим с: {', '.join(suggestion['compatible_with'])}"
+                for i, suggestion in enumerate(islice(suggestions, 8), 1)
             )
+        )
     else:
         logger.info("\n✅ Camelot Wheel покрытие достаточное")
 
@@ -478,7 +492,7 @@ if __name__ == "__main__":
         logger.info(f"  2. Пересмотреть {stats['poor']} треков с низким качеством")
 
     if len(camelot_analysis["isolated_keys"]) > 0:
-        suggested_keys = [s["key"] for s in suggestions[:3]]
+        suggested_keys = [s["key"] for s in islice(suggestions, 3)]
         logger.info(
             f"  3. Добавить треки в ключах: {', '.join(suggested_keys)} для лучшей связности"
         )
@@ -496,3 +510,21 @@ if __name__ == "__main__":
     logger.info("\n" + "=" * 70)
     logger.info("✨ Анализ завершен!")
     logger.info("=" * 70)
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+if __name__ == "__main__":
+    logger.info("=" * 70)
+    logger.info("🔍 ВАЛИДАЦИЯ И ФИЛЬТРАЦИЯ ПЛЕЙЛИСТА")
+    logger.info("=" * 70)
+
+    # Загрузка метаданных
+    logger.info(f"\n📋 Загрузка метаданных из {METADATA_FILE}...")
+    tracks = load_json(METADATA_FILE)["tracks"]
+
+    logger.info(f"✓ Загружено {len(tracks)} треков\n")
+
+    run(tracks)
@@ -6,8 +6,14 @@
 
 import json
 import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+from camelot import CAMELOT_CODES, CAMELOT_IDX
+from common import load_json
+
 # Настройка логирования
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s | %(levelname)-8s | %(message)s", datefmt="%H:%M:%S"
@@ -17,6 +23,14 @@ logger = logging.getLogger(__name__)
 PROJECT_DIR = Path(__file__).parent
 DJ_SET_DIR = PROJECT_DIR / "dj_set_techno_2025"
 METADATA_FILE = DJ_SET_DIR / "tracklist_metadata.json"
+# Индекс уже записанных тегов: повторный запуск пропускает неизмененные файлы
+TAG_INDEX_FILE = DJ_SET_DIR / ".tag_write_index.json"
+
+# --force: перезаписать теги во всех файлах, игнорируя индекс
+FORCE = "--force" in sys.argv
+
+# Параллельная запись тегов: audio.save() упирается в диск, а не в CPU
+TAG_WORKERS = min(16, (os.cpu_count() or 1) * 2)
 
 # Проверка зависимостей
 try:
@@ -29,9 +43,6 @@ except ImportError:
     logger.error("❌ mutagen не установлен")
     logger.info("Установите: pip install mutagen")
     HAS_MUTAGEN = False
-    import sys
-
-    sys.exit(1)
 
 
 # OpenKey (Camelot) mapping для djay Pro
@@ -62,29 +73,81 @@ CAMELOT_TO_OPENKEY = {
     "12B": "5d",
 }
 
+# OpenKey по индексу Camelot кода (CAMELOT_IDX): строка и готовые UTF-8 байты для M4A
+OPENKEY_BY_IDX = tuple(CAMELOT_TO_OPENKEY[camelot] for camelot in CAMELOT_CODES)
+OPENKEY_BYTES_BY_IDX = tuple(openkey.encode("utf-8") for openkey in OPENKEY_BY_IDX)
+
+
+def load_tag_index(path):
+    """Индекс записанных тегов: {file_path: [mtime_ns, bpm, key, camelot, energy]}"""
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except ValueError:
+        logger.warning(f"⚠️  Индекс тегов поврежден, файлы будут перезаписаны: {path.name}")
+        return {}
+
+
+def scan_dir(directory):
+    """Файлы директории одним проходом os.scandir: {имя файла: DirEntry}"""
+    try:
+        with os.scandir(directory) as entries:
+            return {entry.name: entry for entry in entries if entry.is_file()}
+    except FileNotFoundError:
+        return {}
+
+
+def build_tag_payload(track):
+    """Готовые значения тегов трека: считаются один раз до записи файлов"""
+    bpm = track.get("bpm")
+    camelot = track.get("camelot")
+    energy = track.get("energy")
+
+    camelot_idx = CAMELOT_IDX.get(camelot)
+    if camelot_idx is not None:
+        openkey = OPENKEY_BY_IDX[camelot_idx]
+        openkey_bytes = OPENKEY_BYTES_BY_IDX[camelot_idx]
+    elif camelot:
+        # Неизвестный код пишется как есть
+        openkey = camelot
+        openkey_bytes = camelot.encode("utf-8")
+    else:
+        openkey = openkey_bytes = None
+
+    return {
+        "bpm_text": str(int(round(bpm))) if bpm else None,
+        "tmpo": int(round(bpm)) if bpm else None,
+        "key": track.get("key") or None,
+        "openkey": openkey,
+        "openkey_bytes": openkey_bytes,
+        "camelot_comment": f"{camelot} ({openkey})" if camelot else None,
+        "energy_text": str(energy) if energy else None,
+        "energy_bytes": str(energy).encode("utf-8") if energy else None,
+    }
 
-def write_m4a_tags(file_path, bpm=None, key=None, camelot=None, energy=None):
+
+def write_m4a_tags(file_path, payload):
     """Запись тегов в M4A файл (iTunes/Apple format)"""
     try:
         audio = MP4(str(file_path))
 
         # BPM
-        if bpm:
-            audio["\xa9BPM"] = [str(int(round(bpm)))]  # Apple BPM tag
-            audio["tmpo"] = [int(round(bpm))]  # Alternative BPM tag
+        if payload["bpm_text"]:
+            audio["\xa9BPM"] = [payload["bpm_text"]]  # Apple BPM tag
+            audio["tmpo"] = [payload["tmpo"]]  # Alternative BPM tag
 
         # Key (Musical Key format для djay Pro)
-        if key:
-            audio["\xa9key"] = [key]  # Apple key tag
+        if payload["key"]:
+            audio["\xa9key"] = [payload["key"]]  # Apple key tag
 
         # OpenKey (Camelot для djay Pro)
-        if camelot:
-            openkey = CAMELOT_TO_OPENKEY.get(camelot, camelot)
-            audio["----:com.apple.iTunes:KEY"] = openkey.encode("utf-8")
+        if payload["openkey_bytes"]:
+            audio["----:com.apple.iTunes:KEY"] = payload["openkey_bytes"]
 
         # Energy (custom tag)
-        if energy:
-            audio["----:com.apple.iTunes:ENERGY"] = str(energy).encode("utf-8")
+        if payload["energy_bytes"]:
+            audio["----:com.apple.iTunes:ENERGY"] = payload["energy_bytes"]
 
         audio.save()
         return True
@@ -93,27 +156,26 @@ def write_m4a_tags(file_path, bpm=None, key=None, camelot=None, energy=None):
         return False
 
 
-def write_mp3_tags(file_path, bpm=None, key=None, camelot=None, energy=None):
+def write_mp3_tags(file_path, payload):
     """Запись ID3 тегов в MP3 файл"""
     try:
         audio = ID3(str(file_path))
 
         # BPM
-        if bpm:
-            audio.add(TBPM(encoding=3, text=str(int(round(bpm)))))
+        if payload["bpm_text"]:
+            audio.add(TBPM(encoding=3, text=payload["bpm_text"]))
 
         # Key
-        if key:
-            audio.add(TKEY(encoding=3, text=key))
+        if payload["key"]:
+            audio.add(TKEY(encoding=3, text=payload["key"]))
 
         # OpenKey/Camelot в комментариях
-        if camelot:
-            openkey = CAMELOT_TO_OPENKEY.get(camelot, camelot)
-            audio.add(COMM(encoding=3, lang="eng", desc="Camelot", text=f"{camelot} ({openkey})"))
+        if payload["camelot_comment"]:
+            audio.add(COMM(encoding=3, lang="eng", desc="Camelot", text=payload["camelot_comment"]))
 
         # Energy
-        if energy:
-            audio.add(COMM(encoding=3, lang="eng", desc="Energy", text=str(energy)))
+        if payload["energy_text"]:
+            audio.add(COMM(encoding=3, lang="eng", desc="Energy", text=payload["energy_text"]))
 
         audio.save()
         return True
@@ -122,79 +184,143 @@ def write_mp3_tags(file_path, bpm=None, key=None, camelot=None, energy=None):
         return False
 
 
-def write_audio_tags(file_path, track):
-    """Универсальная запись тегов в аудиофайл"""
-    bpm = track.get("bpm")
-    key = track.get("key")
-    camelot = track.get("camelot")
-    energy = track.get("energy")
+def tag_writer(file_path):
+    """Функция записи тегов по расширению файла (None — формат не поддерживается)"""
+    return TAG_WRITERS.get(file_path.suffix.lower())
+
 
+def write_audio_tags(file_path, payload):
+    """Универсальная запись тегов в аудиофайл (payload из build_tag_payload)"""
     file_path = Path(file_path)
+    writer = tag_writer(file_path)
 
-    if file_path.suffix.lower() in [".m4a", ".mp4", ".m4p"]:
-        return write_m4a_tags(file_path, bpm, key, camelot, energy)
-    elif file_path.suffix.lower() == ".mp3":
-        return write_mp3_tags(file_path, bpm, key, camelot, energy)
-    else:
+    if writer is None:
         logger.warning(f"Неподдерживаемый формат: {file_path.suffix}")
         return False
+    return writer(file_path, payload)
 
 
-# ============================================================================
-# MAIN
-# ============================================================================
-
-logger.info("=" * 70)
-logger.info("💾 ЗАПИСЬ МЕТАДАННЫХ В АУДИОФАЙЛЫ")
-logger.info("=" * 70)
+# Запись тегов по расширению файла
+TAG_WRITERS = {
+    ".m4a": write_m4a_tags,
+    ".mp4": write_m4a_tags,
+    ".m4p": write_m4a_tags,
+    ".mp3": write_mp3_tags,
+}
 
-# Загрузка метаданных
-logger.info(f"\n📋 Загрузка метаданных из {METADATA_FILE}...")
-with open(METADATA_FILE, encoding="utf-8") as f:
-    data = json.load(f)
-    tracks = data["tracks"]
 
-logger.info(f"✓ Загружено {len(tracks)} треков\n")
+# ============================================================================
+# ЗАПИСЬ ТЕГОВ
+# ============================================================================
 
-# Запись тегов
-logger.info("🎵 Запись BPM, Key, Camelot в аудиофайлы...\n")
-stats = {"success": 0, "error": 0, "missing": 0}
 
-for idx, track in enumerate(tracks, 1):
-    file_path = Path(track["file_path"])
+def run(tracks):
+    """Запись тегов для tracks (любой iterable треков из метаданных)"""
+
+    logger.info("🎵 Запись BPM, Key, Camelot в аудиофайлы...\n")
+    stats = {"success": 0, "error": 0, "missing": 0, "unchanged": 0}
+    total = 0
+    tag_index = {} if FORCE else load_tag_index(TAG_INDEX_FILE)
+    # Содержимое директорий треков: одно сканирование на директорию вместо
+    # проверки каждого файла отдельно
+    dir_files = {}
+
+    with ThreadPoolExecutor(max_workers=TAG_WORKERS) as executor:
+        # Отсутствующие и неподдерживаемые файлы отсеиваются до отправки в пул,
+        # для остальных формат определяется один раз: воркеры вызывают writer напрямую
+        futures = {}
+        for idx, track in enumerate(tracks, 1):
+            total = idx
+            file_path = Path(track["file_path"])
+
+            files = dir_files.get(file_path.parent)
+            if files is None:
+                files = dir_files[file_path.parent] = scan_dir(file_path.parent)
+
+            entry = files.get(file_path.name)
+            if entry is None:
+                logger.warning(f"⚠️  [{idx:02d}/50] Файл не найден: {file_path.name}")
+                stats["missing"] += 1
+                continue
+            mtime_ns = entry.stat().st_mtime_ns
+
+            # Файл не менялся с прошлой записи тех же значений — пропускаем
+            tag_values = [
+                track.get("bpm"),
+                track.get("key"),
+                track.get("camelot"),
+                track.get("energy"),
+            ]
+            if tag_index.get(str(file_path)) == [mtime_ns, *tag_values]:
+                stats["unchanged"] += 1
+                continue
+
+            writer = tag_writer(file_path)
+            if writer is None:
+                logger.warning(f"Неподдерживаемый формат: {file_path.suffix}")
+                stats["error"] += 1
+                continue
+
+            payload = build_tag_payload(track)
+            futures[executor.submit(writer, file_path, payload)] = (
+                idx,
+                track,
+                file_path,
+                tag_values,
+                payload,
+            )
+
+        logger.info(f"✓ Загружено {total} треков\n")
+
+        # Результаты записи логируются по мере завершения
+        for future in as_completed(futures):
+            idx, track, file_path, tag_values, payload = futures[future]
+            logger.info(f"🔧 [{idx:02d}/50] {track['artist'][:30]:30}")
+
+            if future.result():
+                bpm = track.get("bpm", "N/A")
+                key = track.get("key", "N/A")
+                camelot = track.get("camelot", "N/A")
+                openkey = payload["openkey"] or "N/A"
+
+                logger.info(f"    ✓ BPM: {bpm}, Key: {key} ({camelot} / OpenKey: {openkey})")
+                stats["success"] += 1
+                # mtime после записи: следующий запуск сравнивает с ним
+                tag_index[str(file_path)] = [file_path.stat().st_mtime_ns, *tag_values]
+            else:
+                stats["error"] += 1
+
+    TAG_INDEX_FILE.write_text(json.dumps(tag_index, ensure_ascii=False), encoding="utf-8")
+
+    # Статистика
+    logger.info("\n" + "=" * 70)
+    logger.info("📊 СТАТИСТИКА")
+    logger.info("=" * 70)
+    logger.info(f"✅ Успешно обновлено: {stats['success']}/{total}")
+    logger.info(f"❌ Ошибки:            {stats['error']}/{total}")
+    logger.info(f"⚠️  Файлы не найдены:  {stats['missing']}/{total}")
+    logger.info(f"⏭️  Без изменений:     {stats['unchanged']}/{total}")
+    logger.info("=" * 70)
+
+    logger.info("\n✨ Готово!")
+    logger.info("\n📖 Следующие шаги:")
+    logger.info("   1. Импортируйте M3U8 в djay Pro AI:")
+    logger.info("      File → Import → M3U8 Playlist")
+    logger.info("   2. djay Pro автоматически прочитает BPM и Key из файлов")
+    logger.info("   3. Используйте Color Coding для harmonic mixing")
 
-    if not file_path.exists():
-        logger.warning(f"⚠️  [{idx:02d}/50] Файл не найден: {file_path.name}")
-        stats["missing"] += 1
-        continue
 
-    logger.info(f"🔧 [{idx:02d}/50] {track['artist'][:30]:30}")
+# ============================================================================
+# MAIN
+# ============================================================================
 
-    success = write_audio_tags(file_path, track)
+if __name__ == "__main__":
+    if not HAS_MUTAGEN:
+        sys.exit(1)
 
-    if success:
-        bpm = track.get("bpm", "N/A")
-        key = track.get("key", "N/A")
-        camelot = track.get("camelot", "N/A")
-        openkey = CAMELOT_TO_OPENKEY.get(camelot, "N/A") if camelot != "N/A" else "N/A"
+    logger.info("=" * 70)
+    logger.info("💾 ЗАПИСЬ МЕТАДАННЫХ В АУДИОФАЙЛЫ")
+    logger.info("=" * 70)
 
-        logger.info(f"    ✓ BPM: {bpm}, Key: {key} ({camelot} / OpenKey: {openkey})")
-        stats["success"] += 1
-    else:
-        stats["error"] += 1
-
-# Статистика
-logger.info("\n" + "=" * 70)
-logger.info("📊 СТАТИСТИКА")
-logger.info("=" * 70)
-logger.info(f"✅ Успешно обновлено: {stats['success']}/{len(tracks)}")
-logger.info(f"❌ Ошибки:            {stats['error']}/{len(tracks)}")
-logger.info(f"⚠️  Файлы не найдены:  {stats['missing']}/{len(tracks)}")
-logger.info("=" * 70)
-
-logger.info("\n✨ Готово!")
-logger.info("\n📖 Следующие шаги:")
-logger.info("   1. Импортируйте M3U8 в djay Pro AI:")
-logger.info("      File → Import → M3U8 Playlist")
-logger.info("   2. djay Pro автоматически прочитает BPM и Key из файлов")
-logger.info("   3. Используйте Color Coding для harmonic mixing")
+    logger.info(f"\n📋 Загрузка метаданных из {METADATA_FILE}...")
+    run(load_json(METADATA_FILE)["tracks"])